@@ -0,0 +1,46 @@
+"""
+Cache configuration from the environment.
+
+``CACHE_URL`` selects the backend:
+
+    locmem://                 per-process memory (default)
+    file:///var/cache/swapnest
+    redis://host:6379/0       any Redis-compatible server (rediss:// for TLS)
+    dummy://                  caching disabled
+
+``CACHE_TIMEOUT`` sets the default expiry in seconds (default 300).
+"""
+import os
+from urllib.parse import urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+def cache_config(base_dir, environ=None):
+    """Build the ``default`` CACHES entry from the environment."""
+    environ = os.environ if environ is None else environ
+    url = environ.get('CACHE_URL', 'locmem://')
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme == 'locmem':
+        config = {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': parts.netloc or 'swapnest',
+        }
+    elif scheme == 'file':
+        config = {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': parts.path or str(base_dir / '.cache'),
+        }
+    elif scheme in ('redis', 'rediss'):
+        config = {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': url,
+        }
+    elif scheme == 'dummy':
+        config = {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+    else:
+        raise ImproperlyConfigured(f"Unsupported CACHE_URL scheme: {parts.scheme!r}")
+    config['KEY_PREFIX'] = environ.get('CACHE_KEY_PREFIX', 'swapnest')
+    config['TIMEOUT'] = int(environ.get('CACHE_TIMEOUT', 300))
+    return config
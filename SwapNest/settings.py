@@ -13,6 +13,9 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from pathlib import Path
 from datetime import timedelta
 import os
+import sys
+from .caches import cache_config
+from .database import database_config, replica_configs
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,37 +48,6 @@ INSTALLED_APPS = [
     'core',
 ]
 
-DB_USERNAME = os.environ.get("POSTGRES_USER")
-DB_PASSWORD = os.environ.get("POSTGRES_PASSWORD")
-DB_HOST = os.environ.get("POSTGRES_HOST")
-DB_PORT = os.environ.get("POSTGRES_PORT")
-DB_DATABASE = os.environ.get("POSTGRES_DB")
-POSTGRES_READY = str(os.environ.get("POSTGRES_READY")) == 1
-DB_IS_AVAILABLE = all(
-    [DB_USERNAME, DB_DATABASE, DB_HOST, DB_PASSWORD, DB_PORT])
-
-if DB_IS_AVAILABLE and POSTGRES_READY:
-    DATABASES = {
-
-        'default': {
-
-            'ENGINE': 'django.db.backends.postgresql_psycopg2',
-
-            'NAME': DB_DATABASE,
-
-            'USER': DB_USERNAME,
-
-            'PASSWORD': DB_PASSWORD,
-
-            'HOST': DB_HOST,
-
-            'PORT': DB_PORT,
-
-        }
-
-    }
-
-
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'core.authentication.CookiesJWTAuthentication',
@@ -83,6 +55,17 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.ORJSONRenderer',
+        'core.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.renderers.ORJSONParser',
+        'core.renderers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 SIMPLE_JWT = {
@@ -126,14 +109,19 @@ SIMPLE_JWT = {
 }
 
 MIDDLEWARE = [
+    'core.profiling.ServerTimingMiddleware',
+    'core.querycheck.QueryCheckMiddleware',
+    'core.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
+    'core.middleware.SiteSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.APIOriginCheckMiddleware',
+    'core.middleware.SiteCsrfViewMiddleware',
+    'core.middleware.SiteAuthenticationMiddleware',
+    'core.middleware.SiteMessageMiddleware',
+    'core.middleware.SiteXFrameOptionsMiddleware',
     'core.middleware.TokenRefreshMiddleware',
 ]
 
@@ -161,11 +149,18 @@ WSGI_APPLICATION = 'SwapNest.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Configured from DATABASE_URL (or the POSTGRES_* variables) with persistent,
+# health-checked connections; see SwapNest/database.py for all options.
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_config(BASE_DIR),
+}
+DATABASES.update(replica_configs(BASE_DIR))
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+# Reads go to the primary for this long after a client's last write.
+DATABASE_ROUTING = {
+    'PIN_COOKIE': 'db_primary_pin',
+    'PIN_SECONDS': int(os.environ.get("DATABASE_PIN_SECONDS", 10)),
 }
 
 
@@ -220,3 +215,108 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 CORS_ALLOW_CREDENTIALS = True
+
+# Requests under this prefix skip session, CSRF-token, auth, messages and
+# clickjacking middleware (the Site* classes in core/middleware.py).
+# Cookie-authenticated unsafe API requests sent by browsers must instead come
+# from this host or one of API_TRUSTED_ORIGINS (comma-separated in the
+# environment); clients that send no Origin/Sec-Fetch-Site/Referer pass.
+API_PATH_PREFIX = '/api/'
+API_TRUSTED_ORIGINS = [
+    origin.strip() for origin in os.environ.get("API_TRUSTED_ORIGINS", "").split(",") if origin.strip()
+] or CORS_ALLOWED_ORIGINS
+
+# Transactional outbox (see core/outbox.py)
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", 100))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 10))
+OUTBOX_POLL_INTERVAL = float(os.environ.get("OUTBOX_POLL_INTERVAL", 1.0))
+OUTBOX_HANDLERS = {
+    'OrderPlaced': ['core.outbox.log_event'],
+    'ItemSold': ['core.outbox.log_event'],
+    'BalanceCredited': ['core.outbox.log_event'],
+}
+
+# Configured from CACHE_URL (locmem, file or Redis); see SwapNest/caches.py.
+# Application code goes through core.cache.NamespacedCache.
+CACHES = {
+    'default': cache_config(BASE_DIR),
+}
+# Seconds between pushes of per-process cache statistics to the shared cache.
+CACHE_STATS_PUBLISH_INTERVAL = int(os.environ.get("CACHE_STATS_PUBLISH_INTERVAL", 10))
+
+# Seconds a user's cart summary stays cached; it is also invalidated on change.
+CART_SUMMARY_CACHE_TIMEOUT = int(os.environ.get("CART_SUMMARY_CACHE_TIMEOUT", 300))
+
+# Real-time chat (see core/realtime.py). Set CHAT_BROKER_URL to a Redis URL to
+# fan out events across several ASGI worker processes.
+CHAT_BROKER = {
+    'BACKEND': 'core.realtime.InProcessBroker',
+    'OPTIONS': {'QUEUE_SIZE': 100},
+}
+if os.environ.get("CHAT_BROKER_URL"):
+    CHAT_BROKER = {
+        'BACKEND': 'core.realtime.RedisBroker',
+        'OPTIONS': {'URL': os.environ["CHAT_BROKER_URL"]},
+    }
+
+CHAT_STREAM = {
+    'HEARTBEAT': 15,     # seconds between keep-alive comments
+    'MAX_AGE': 300,      # seconds before the server closes a stream
+    'RETRY_MS': 2000,    # client reconnect delay advertised to EventSource
+}
+
+# Chat message archival (see core/archive.py and the archive_messages command)
+MESSAGE_ARCHIVE = {
+    'AFTER_DAYS': int(os.environ.get("MESSAGE_ARCHIVE_AFTER_DAYS", 180)),
+    'BATCH_SIZE': int(os.environ.get("MESSAGE_ARCHIVE_BATCH_SIZE", 1000)),
+}
+
+CHAT_LONG_POLL = {
+    'TIMEOUT': 25,       # maximum seconds a poll request is parked
+    'LIMIT': 100,        # maximum messages returned per poll
+}
+
+# Streaming finance exports (see core/exports.py and the export_data command)
+DATA_EXPORT = {
+    'CHUNK_SIZE': int(os.environ.get("DATA_EXPORT_CHUNK_SIZE", 2000)),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core': {'handlers': ['console'], 'level': os.environ.get("CORE_LOG_LEVEL", "INFO")},
+    },
+}
+
+# Server-Timing header and per-request timing log (see core/profiling.py).
+# SAMPLE_RATE is the fraction of requests measured, from 0 to 1.
+SERVER_TIMING = {
+    'ENABLED': os.environ.get("SERVER_TIMING", "").lower() in ("1", "true", "on"),
+    'SAMPLE_RATE': float(os.environ.get("SERVER_TIMING_SAMPLE_RATE", 1.0)),
+    'LOG': True,
+}
+
+# N+1 and slow-query detection (see core/querycheck.py); development and tests only.
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+QUERY_CHECK = {
+    'ENABLED': DEBUG or TESTING or os.environ.get("QUERY_CHECK", "").lower() in ("1", "true", "on"),
+    'N_PLUS_ONE_THRESHOLD': int(os.environ.get("QUERY_CHECK_N_PLUS_ONE", 5)),
+    'SLOW_QUERY_MS': float(os.environ.get("QUERY_CHECK_SLOW_MS", 100)),
+    'RAISE': os.environ.get("QUERY_CHECK_RAISE", "").lower() in ("1", "true", "on"),
+    'APP_FRAMES': ['core/views.py', 'core/serializers.py'],
+}
+
+# Prometheus metrics at /metrics (see core/metrics.py). Scrapers must send
+# "Authorization: Bearer <METRICS_TOKEN>"; without a token the endpoint is
+# only served under DEBUG. Set METRICS_MULTIPROC_DIR when running several
+# worker processes.
+METRICS = {
+    'ENABLED': os.environ.get("METRICS", "on").lower() in ("1", "true", "on"),
+    'TOKEN': os.environ.get("METRICS_TOKEN", ""),
+    'MULTIPROC_DIR': os.environ.get("METRICS_MULTIPROC_DIR", ""),
+    'SNAPSHOT_INTERVAL': float(os.environ.get("METRICS_SNAPSHOT_INTERVAL", 5)),
+}
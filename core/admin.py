@@ -1,10 +1,71 @@
+import uuid
+
 from django.contrib import admin
+from django.contrib.admin.utils import get_fields_from_path
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.paginator import Paginator
+from django.db import connections, models
+from django.db.models import Q
+from django.utils.functional import cached_property
 from .models import (
     User, Category, Product, ProductImage, Transaction, Report,
-    Conversation, Message, Cart, CartItem, Order, OrderItem
+    Conversation, Message, ArchivedMessage, Cart, CartItem, Order, OrderItem, OutboxEvent,
+    DailyMetric
 )
 
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that reads the planner's row estimate for unfiltered changelists
+    on PostgreSQL instead of running COUNT(*) over the whole table. Filtered
+    lists, small tables and other databases still get an exact count.
+    """
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self):
+        query = self.object_list.query
+        connection = connections[self.object_list.db]
+        if connection.vendor == 'postgresql' and not query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                    [self.object_list.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= self.exact_count_threshold:
+                return row[0]
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Base admin for tables that grow without bound: estimated page counts, no
+    second unfiltered COUNT(*) for the "x of y" display.
+
+    Search fields use Django's case-insensitive lookups: ``^`` (istartswith)
+    and plain (icontains) text fields compile to ``UPPER(col) LIKE`` and are
+    served on PostgreSQL by the trigram indexes from migration 0015; ``=``
+    (iexact) fields compare ``UPPER(col)`` against the Upper() indexes in the
+    models. UUID columns are the exception, see get_search_results().
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        # iexact on a UUID column compiles to UPPER(col::text) on PostgreSQL,
+        # which no key index serves; a UUID term is matched exactly instead.
+        try:
+            value = uuid.UUID(search_term.strip())
+        except ValueError:
+            return super().get_search_results(request, queryset, search_term)
+        paths = [path.lstrip('^=@') for path in self.get_search_fields(request)]
+        matches = Q(pk__in=[])
+        for path in paths:
+            if isinstance(get_fields_from_path(self.model, path)[-1], models.UUIDField):
+                matches |= Q(**{path: value})
+        return queryset.filter(matches), False
+
 # Custom UserAdmin for our custom User model.
 
 
@@ -13,8 +74,10 @@ class CustomUserAdmin(BaseUserAdmin):
     list_display = ('username', 'email', 'role',
                     'is_active', 'balance', 'created_at')
     list_filter = ('role', 'is_active',)
-    search_fields = ('username', 'email')
+    search_fields = ('^username', '=email')
     ordering = ('-created_at',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     # Remove non-editable fields from fieldsets.
     fieldsets = (
@@ -48,78 +111,124 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(LargeTableAdmin):
     list_display = ('title', 'seller', 'price', 'condition',
                     'is_active', 'is_sold', 'created_at')
     list_filter = ('condition', 'is_active', 'is_sold', 'category')
-    search_fields = ('title', 'description', 'seller__username', "price")
+    list_select_related = ('seller',)
+    search_fields = ('^title', 'description', '=seller__username', '=id')
+    raw_id_fields = ('seller', 'bought_by')
+    autocomplete_fields = ('category',)
     ordering = ('-created_at',)
 
 
 @admin.register(ProductImage)
-class ProductImageAdmin(admin.ModelAdmin):
+class ProductImageAdmin(LargeTableAdmin):
     list_display = ('product', 'caption', 'order', 'created_at')
     list_filter = ('order',)
+    list_select_related = ('product',)
+    search_fields = ('=product__id',)
+    raw_id_fields = ('product',)
     ordering = ('order',)
 
 
 @admin.register(Transaction)
-class TransactionAdmin(admin.ModelAdmin):
+class TransactionAdmin(LargeTableAdmin):
     list_display = ('id', 'product', 'buyer', 'seller',
                     'amount', 'transaction_status', 'created_at')
     list_filter = ('transaction_status', 'payment_method')
-    search_fields = ('product__title', 'buyer__username', 'seller__username')
+    list_select_related = ('product', 'buyer', 'seller')
+    search_fields = ('=id', '^product__title', '=product__id', '=buyer__username', '=seller__username')
+    raw_id_fields = ('product', 'buyer', 'seller')
     ordering = ('-created_at',)
 
 
 @admin.register(Report)
-class ReportAdmin(admin.ModelAdmin):
+class ReportAdmin(LargeTableAdmin):
     list_display = ('id', 'reporter', 'reason', 'status', 'created_at')
     list_filter = ('status',)
-    search_fields = ('reporter__username', 'reason')
+    list_select_related = ('reporter',)
+    search_fields = ('=reporter__username', '^reported_product__title', '=reported_user__username', '=id')
+    raw_id_fields = ('reporter', 'reported_product', 'reported_user', 'reviewed_by')
     ordering = ('-created_at',)
 
 
 @admin.register(Conversation)
-class ConversationAdmin(admin.ModelAdmin):
+class ConversationAdmin(LargeTableAdmin):
     list_display = ('id', 'product', 'created_at')
     list_filter = ('created_at',)
-    search_fields = ('product__title',)
+    list_select_related = ('product',)
+    search_fields = ('=id', '^product__title', '=product__id')
+    raw_id_fields = ('product', 'buyer', 'seller', 'last_message_sender', 'participants')
     ordering = ('-created_at',)
 
 
 @admin.register(Message)
-class MessageAdmin(admin.ModelAdmin):
+class MessageAdmin(LargeTableAdmin):
     list_display = ('id', 'sender', 'conversation', 'created_at')
     list_filter = ('read_status', 'created_at')
-    search_fields = ('sender__username', 'conversation__id')
+    list_select_related = ('sender', 'conversation__product')
+    search_fields = ('=sender__username', '=conversation__id')
+    raw_id_fields = ('conversation', 'sender')
+    ordering = ('created_at',)
+
+
+@admin.register(ArchivedMessage)
+class ArchivedMessageAdmin(LargeTableAdmin):
+    list_display = ('id', 'sender', 'conversation', 'created_at', 'archived_at')
+    list_select_related = ('sender', 'conversation__product')
+    search_fields = ('=sender__username', '=conversation__id')
+    raw_id_fields = ('conversation', 'sender')
     ordering = ('created_at',)
 
 
 @admin.register(Cart)
-class CartAdmin(admin.ModelAdmin):
+class CartAdmin(LargeTableAdmin):
     list_display = ('user', 'created_at', 'updated_at')
-    search_fields = ('user__username',)
+    list_select_related = ('user',)
+    search_fields = ('=user__username',)
+    raw_id_fields = ('user',)
     ordering = ('-created_at',)
 
 
 @admin.register(CartItem)
-class CartItemAdmin(admin.ModelAdmin):
+class CartItemAdmin(LargeTableAdmin):
     list_display = ('id', 'cart', 'product', 'created_at')
-    search_fields = ('cart__user__username', 'product__title')
+    list_select_related = ('cart__user', 'product')
+    search_fields = ('=cart__user__username', '^product__title', '=product__id')
+    raw_id_fields = ('cart', 'product')
     ordering = ('-created_at',)
 
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(LargeTableAdmin):
     list_display = ('id', 'user', 'status', 'total', 'created_at')
     list_filter = ('status',)
-    search_fields = ('user__username',)
+    list_select_related = ('user',)
+    search_fields = ('=id', '=user__username')
+    raw_id_fields = ('user',)
     ordering = ('-created_at',)
 
 
 @admin.register(OrderItem)
-class OrderItemAdmin(admin.ModelAdmin):
+class OrderItemAdmin(LargeTableAdmin):
     list_display = ('id', 'order', 'product', 'price')
-    search_fields = ('order__id', 'product__title')
+    list_select_related = ('order__user', 'product')
+    search_fields = ('=order__id', '^product__title', '=product__id')
+    raw_id_fields = ('order', 'product')
     ordering = ('id',)
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(LargeTableAdmin):
+    list_display = ('id', 'event_type', 'status', 'attempts', 'available_at', 'processed_at', 'created_at')
+    list_filter = ('event_type', 'status')
+    search_fields = ('=id',)
+    ordering = ('-created_at',)
+
+
+@admin.register(DailyMetric)
+class DailyMetricAdmin(admin.ModelAdmin):
+    list_display = ('day', 'category', 'orders', 'items_sold', 'gmv', 'new_listings', 'new_users')
+    list_filter = ('category',)
+    ordering = ('-day',)
@@ -1,6 +1,19 @@
+import logging
+
 from django.apps import AppConfig
 
+logger = logging.getLogger(__name__)
+
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from django.conf import settings
+        from SwapNest.database import describe
+
+        logger.info("Database backend: %s", describe(settings.DATABASES['default']))
+        for alias in settings.DATABASE_REPLICAS:
+            logger.info("Read replica %s: %s", alias, describe(settings.DATABASES[alias]))
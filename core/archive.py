@@ -0,0 +1,58 @@
+"""
+Cold storage for old chat messages.
+
+``archive_messages`` moves messages older than a horizon from the hot Message
+table into ArchivedMessage in bounded batches, each in its own transaction,
+so the hot table and its indexes stay proportional to recent traffic.
+Conversation history endpoints read through to the archive once the hot rows
+are exhausted (see MessageCursorPagination).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedMessage, ConversationReadMarker, Message
+
+ARCHIVED_FIELDS = ['id', 'conversation_id', 'sender_id', 'content', 'read_status', 'created_at', 'updated_at']
+
+
+def archive_cutoff(days=None):
+    days = settings.MESSAGE_ARCHIVE['AFTER_DAYS'] if days is None else days
+    return timezone.now() - timedelta(days=days)
+
+
+def archive_batch(cutoff, batch_size):
+    """Move up to ``batch_size`` of the oldest messages sent before ``cutoff``; return how many moved."""
+    with transaction.atomic():
+        rows = list(
+            Message.objects.filter(created_at__lt=cutoff)
+            .order_by('created_at', 'id')
+            .values_list(*ARCHIVED_FIELDS)[:batch_size]
+        )
+        if not rows:
+            return 0
+        # ignore_conflicts keeps a re-run after a partial failure idempotent.
+        ArchivedMessage.objects.bulk_create(
+            [ArchivedMessage(**dict(zip(ARCHIVED_FIELDS, row))) for row in rows],
+            ignore_conflicts=True
+        )
+        Message.objects.filter(id__in=[row[0] for row in rows]).delete()
+        # Archived messages can no longer be marked read, so they stop counting as unread.
+        read_status = ARCHIVED_FIELDS.index('read_status')
+        ConversationReadMarker.forget_unread([(row[1], row[2]) for row in rows if not row[read_status]])
+    return len(rows)
+
+
+def archive_messages(cutoff, batch_size=None, max_batches=None):
+    """Archive batches until nothing older than ``cutoff`` remains or ``max_batches`` is reached."""
+    batch_size = batch_size or settings.MESSAGE_ARCHIVE['BATCH_SIZE']
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(cutoff, batch_size)
+        if not moved:
+            break
+        total += moved
+        batches += 1
+    return total
@@ -0,0 +1,219 @@
+"""
+Native async views served through SwapNest/asgi.py.
+
+These are plain Django views rather than DRF views so they run on the event
+loop without a per-request worker thread. Under WSGI Django buffers async
+streams until they finish, so the streaming endpoints need an ASGI server.
+
+The read endpoints at the bottom are async twins of hot DRF list/detail
+views, reusing their querysets and serializers with the async ORM; every
+relation they render is loaded up front so serialization never touches the
+database. Compare them with ``manage.py benchmark_async_views``.
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import NotFound
+
+from .authentication import aauthenticate
+from .models import Category, Message, Product
+from .pagination import (
+    InboxCursorPagination, MessageCursorPagination, decode_cursor, encode_cursor, keyset_filter, row_position
+)
+from .realtime import get_broker, user_channel
+from .renderers import ORJSONRenderer
+from .serializers import CategorySerializer, InboxConversationSerializer, MessageSerializer, ProductSerializer
+from .views import browse_products, inbox_queryset
+
+
+def _unauthorized():
+    return JsonResponse(
+        {"error": "Unauthorized", "detail": "Authentication credentials were not provided or are invalid."},
+        status=401
+    )
+
+
+def _sse(message):
+    return f"event: {message['type']}\ndata: {json.dumps(message['data'], cls=DjangoJSONEncoder)}\n\n"
+
+
+async def chat_stream(request):
+    """
+    Server-Sent Events stream of chat events for the authenticated user.
+
+    Emits ``message`` events for new messages and ``read`` events for read
+    receipts in any of the user's conversations. The stream closes after
+    CHAT_STREAM['MAX_AGE'] seconds; EventSource clients reconnect on their own.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    user = await aauthenticate(request)
+    if user is None:
+        return _unauthorized()
+
+    config = settings.CHAT_STREAM
+    channel = user_channel(user.id)
+
+    async def events():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + config['MAX_AGE']
+        yield f"retry: {config['RETRY_MS']}\n\n"
+        async with get_broker().subscribe(channel) as subscription:
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    message = await asyncio.wait_for(
+                        subscription.get(), timeout=min(config['HEARTBEAT'], remaining)
+                    )
+                except asyncio.TimeoutError:
+                    # Comment lines keep proxies from closing an idle connection.
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse(message)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _messages_after(user, position, limit):
+    """
+    New messages in any of ``user``'s conversations after ``position``, oldest
+    first. Read from the primary: after a wake-up a lagging replica may not
+    have the message yet, which would park the client until the timeout.
+    """
+    fields = list(MessageCursorPagination.ordering)
+    queryset = Message.objects.using('default').filter(conversation__participants=user).order_by(*fields)
+    if position:
+        queryset = queryset.filter(keyset_filter(fields, position, descending=False))
+    messages = list(queryset[:limit])
+    latest = encode_cursor(row_position(messages[-1], fields)) if messages else None
+    return MessageSerializer(messages, many=True).data, latest
+
+
+def _latest_cursor(user):
+    fields = list(MessageCursorPagination.ordering)
+    message = (
+        Message.objects.using('default').filter(conversation__participants=user)
+        .order_by(*[f"-{f}" for f in fields]).first()
+    )
+    return encode_cursor(row_position(message, fields)) if message else None
+
+
+async def chat_poll(request):
+    """
+    Long-poll fallback for clients that cannot keep a stream open.
+
+    ``GET ?since=<latest>`` returns immediately if the user has messages newer
+    than the cursor; otherwise the request is parked until a message event is
+    published for the user or the timeout elapses, and an empty result is
+    returned. Without ``since`` it returns the current ``latest`` cursor so the
+    client can start polling (an empty ``since=`` waits for the first message).
+    Parked requests hold no thread or DB connection.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    user = await aauthenticate(request)
+    if user is None:
+        return _unauthorized()
+
+    config = settings.CHAT_LONG_POLL
+    since = request.GET.get('since')
+    try:
+        timeout = min(float(request.GET.get('timeout', config['TIMEOUT'])), config['TIMEOUT'])
+    except ValueError:
+        timeout = config['TIMEOUT']
+
+    if since is None:
+        latest = await sync_to_async(_latest_cursor)(user)
+        return JsonResponse({'results': [], 'latest': latest})
+    try:
+        position = decode_cursor(since, Message, MessageCursorPagination.ordering) if since else None
+    except NotFound:
+        return JsonResponse({"error": "Bad Request", "detail": "Invalid cursor."}, status=400)
+
+    fetch = sync_to_async(_messages_after)
+    # Subscribe before checking the database so a message sent in between is not missed.
+    async with get_broker().subscribe(user_channel(user.id)) as subscription:
+        results, latest = await fetch(user, position, config['LIMIT'])
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not results and (remaining := deadline - loop.time()) > 0:
+            try:
+                message = await asyncio.wait_for(subscription.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            if message['type'] == 'message':
+                results, latest = await fetch(user, position, config['LIMIT'])
+
+    return JsonResponse({'results': results, 'latest': latest or since}, encoder=DjangoJSONEncoder)
+
+
+# ---------------------------------------------------
+# Async read endpoints
+# ---------------------------------------------------
+def _json(data, status=200):
+    return HttpResponse(ORJSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def _not_found():
+    return _json({"detail": "Not found."}, status=404)
+
+
+async def _authenticated_get(request):
+    """The authenticated user for a GET request, or the error response to return."""
+    if request.method != 'GET':
+        return None, HttpResponseNotAllowed(['GET'])
+    user = await aauthenticate(request)
+    if user is None:
+        return None, _unauthorized()
+    return user, None
+
+
+async def product_list(request):
+    """Async twin of GET /api/products/ (same filters and payload)."""
+    user, error = await _authenticated_get(request)
+    if error:
+        return error
+    queryset = browse_products(request.GET, user).select_related('bought_by').prefetch_related('images')
+    products = [product async for product in queryset]
+    return _json(ProductSerializer(products, many=True).data)
+
+
+async def product_detail(request, pk):
+    """Async twin of GET /api/products/<id>/."""
+    user, error = await _authenticated_get(request)
+    if error:
+        return error
+    queryset = browse_products({}, user).select_related('bought_by').prefetch_related('images')
+    try:
+        product = await queryset.aget(pk=pk)
+    except Product.DoesNotExist:
+        return _not_found()
+    return _json(ProductSerializer(product).data)
+
+
+async def category_list(request):
+    """Async twin of GET /api/categories/."""
+    user, error = await _authenticated_get(request)
+    if error:
+        return error
+    categories = [category async for category in Category.objects.all()]
+    return _json(CategorySerializer(categories, many=True).data)
+
+
+async def inbox(request):
+    """Async twin of GET /api/conversations/inbox/ (same cursors and payload)."""
+    user, error = await _authenticated_get(request)
+    if error:
+        return error
+    paginator = InboxCursorPagination()
+    try:
+        page = await paginator.apaginate_queryset(inbox_queryset(user), request)
+    except NotFound:
+        return _not_found()
+    return _json(paginator.get_paginated_data(InboxConversationSerializer(page, many=True).data))
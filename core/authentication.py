@@ -1,6 +1,9 @@
+from asgiref.sync import sync_to_async
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 
+from .profiling import timing
+
 class CookiesJWTAuthentication(JWTAuthentication):
     def authenticate(self, request):
         access_token = request.COOKIES.get('access_token')
@@ -8,11 +11,24 @@ class CookiesJWTAuthentication(JWTAuthentication):
             return None
         
         try:
-            validated_token = self.get_validated_token(access_token)
-            user = self.get_user(validated_token)
+            with timing('auth'):
+                validated_token = self.get_validated_token(access_token)
+                user = self.get_user(validated_token)
             if not user.is_active:
                 raise AuthenticationFailed('User is inactive')
         except Exception as e:
             raise AuthenticationFailed(str(e))
         
-        return (user, validated_token)
\ No newline at end of file
+        return (user, validated_token)
+
+
+async def aauthenticate(request):
+    """
+    Authenticate a plain (non-DRF) async view request from the JWT cookies.
+    Returns the user, or None when the request carries no valid token.
+    """
+    try:
+        result = await sync_to_async(CookiesJWTAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
@@ -0,0 +1,183 @@
+"""
+Namespaced, instrumented access to the Django cache.
+
+Application code caches through a ``NamespacedCache`` rather than the raw
+``django.core.cache.cache``:
+
+- Keys are prefixed with the namespace and its version, so a whole namespace
+  is flushed in O(1) by bumping the version (old entries simply expire).
+- Every operation records hits, misses and latency for its namespace. Counts
+  are kept in process and periodically added to shared counters in the cache
+  itself, where the ``cache_namespaces`` command reads them. With the
+  per-process locmem backend the command can only see its own process.
+"""
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+STAT_FIELDS = ('hits', 'misses', 'sets', 'deletes', 'calls', 'latency_us')
+
+_registry = {}
+_stats_lock = threading.Lock()
+_pending = defaultdict(lambda: dict.fromkeys(STAT_FIELDS, 0))
+_totals = defaultdict(lambda: dict.fromkeys(STAT_FIELDS, 0))
+_last_publish = time.monotonic()
+_MISSING = object()
+
+
+def _version_key(namespace):
+    return f"cache-ns:{namespace}:version"
+
+
+def _stat_key(namespace, field):
+    return f"cache-ns:{namespace}:stats:{field}"
+
+
+def registered_namespaces():
+    return dict(_registry)
+
+
+def local_stats():
+    """Counters recorded by this process since it started, per namespace."""
+    with _stats_lock:
+        return {namespace: dict(counts) for namespace, counts in _totals.items()}
+
+
+def _record(namespace, elapsed, **counts):
+    global _last_publish
+    counts['calls'] = 1
+    counts['latency_us'] = int(elapsed * 1_000_000)
+    with _stats_lock:
+        for field, value in counts.items():
+            _pending[namespace][field] += value
+            _totals[namespace][field] += value
+        due = time.monotonic() - _last_publish >= settings.CACHE_STATS_PUBLISH_INTERVAL
+        if due:
+            _last_publish = time.monotonic()
+            pending = {ns: dict(values) for ns, values in _pending.items()}
+            _pending.clear()
+    if due:
+        publish_stats(pending)
+
+
+def publish_stats(pending=None):
+    """Add locally recorded counters to the shared counters in the cache."""
+    if pending is None:
+        with _stats_lock:
+            pending = {ns: dict(values) for ns, values in _pending.items()}
+            _pending.clear()
+    backend = caches['default']
+    for namespace, values in pending.items():
+        for field, value in values.items():
+            if not value:
+                continue
+            key = _stat_key(namespace, field)
+            # add() creates the counter without expiry; incr() is atomic on
+            # backends that support it (Redis, locmem).
+            backend.add(key, 0, timeout=None)
+            try:
+                backend.incr(key, value)
+            except ValueError:
+                backend.set(key, value, timeout=None)
+
+
+def shared_stats(namespace):
+    """Counters published by all processes for ``namespace``."""
+    keys = [_stat_key(namespace, field) for field in STAT_FIELDS]
+    values = caches['default'].get_many(keys)
+    return {field: values.get(key, 0) for field, key in zip(STAT_FIELDS, keys)}
+
+
+def namespace_version(namespace):
+    return caches['default'].get_or_set(_version_key(namespace), 1, timeout=None)
+
+
+def flush_namespace(namespace):
+    """Invalidate every entry of ``namespace`` by moving to a new key version."""
+    backend = caches['default']
+    backend.add(_version_key(namespace), 1, timeout=None)
+    try:
+        return backend.incr(_version_key(namespace))
+    except ValueError:
+        backend.set(_version_key(namespace), 2, timeout=None)
+        return 2
+
+
+def reset_stats(namespace):
+    caches['default'].delete_many([_stat_key(namespace, field) for field in STAT_FIELDS])
+
+
+class NamespacedCache:
+    """
+    A group of related cache entries sharing a key prefix, default timeout
+    and statistics. Instances are cheap; create one per namespace at module
+    level so the ``cache_namespaces`` command can list it.
+    """
+
+    def __init__(self, namespace, timeout=DEFAULT_TIMEOUT, alias='default'):
+        self.namespace = namespace
+        self.timeout = timeout
+        self.alias = alias
+        _registry[namespace] = self
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def make_key(self, key, version=None):
+        version = namespace_version(self.namespace) if version is None else version
+        return f"{self.namespace}:v{version}:{key}"
+
+    def _timeout(self, timeout):
+        return self.timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def get(self, key, default=None):
+        start = time.perf_counter()
+        value = self.backend.get(self.make_key(key), _MISSING)
+        hit = value is not _MISSING
+        _record(self.namespace, time.perf_counter() - start, hits=int(hit), misses=int(not hit))
+        return value if hit else default
+
+    def get_many(self, keys):
+        start = time.perf_counter()
+        version = namespace_version(self.namespace)
+        full_keys = {self.make_key(key, version): key for key in keys}
+        found = self.backend.get_many(list(full_keys))
+        _record(self.namespace, time.perf_counter() - start,
+                hits=len(found), misses=len(full_keys) - len(found))
+        return {full_keys[full_key]: value for full_key, value in found.items()}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        start = time.perf_counter()
+        self.backend.set(self.make_key(key), value, self._timeout(timeout))
+        _record(self.namespace, time.perf_counter() - start, sets=1)
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT):
+        """Return the cached value, computing and storing ``default()`` on a miss."""
+        start = time.perf_counter()
+        full_key = self.make_key(key)
+        value = self.backend.get(full_key, _MISSING)
+        if value is not _MISSING:
+            _record(self.namespace, time.perf_counter() - start, hits=1)
+            return value
+        value = default() if callable(default) else default
+        self.backend.set(full_key, value, self._timeout(timeout))
+        _record(self.namespace, time.perf_counter() - start, misses=1, sets=1)
+        return value
+
+    def delete(self, key):
+        self.delete_many([key])
+
+    def delete_many(self, keys):
+        start = time.perf_counter()
+        version = namespace_version(self.namespace)
+        keys = [self.make_key(key, version) for key in keys]
+        self.backend.delete_many(keys)
+        _record(self.namespace, time.perf_counter() - start, deletes=len(keys))
+
+    def clear(self):
+        return flush_namespace(self.namespace)
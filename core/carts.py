@@ -0,0 +1,92 @@
+"""
+Cart helpers shared by the cart, checkout and summary views.
+"""
+from decimal import Decimal
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+
+from .cache import NamespacedCache
+from .models import Cart, CartItem
+
+cart_summaries = NamespacedCache('cart-summary', timeout=settings.CART_SUMMARY_CACHE_TIMEOUT)
+
+
+def get_request_cart(request):
+    """
+    Return the requesting user's cart, hitting the database at most once per request.
+
+    Carts are created together with their user at registration; the
+    get_or_create only covers accounts that predate that.
+    """
+    cart = getattr(request, '_cart', None)
+    if cart is None:
+        cart, _ = Cart.objects.get_or_create(user=request.user)
+        request._cart = cart
+    return cart
+
+
+def build_cart_summary(user):
+    """
+    Compute badge and checkout warnings for a user's cart from one narrow query
+    over the cart's items joined to their products.
+    """
+    rows = CartItem.objects.filter(cart__user=user).values_list(
+        'id', 'product_id', 'product__title', 'product__price',
+        'product__is_sold', 'product__is_active', 'product__seller_id', 'product__seller__is_active'
+    )
+    subtotal = Decimal('0.00')
+    unavailable_items = []
+    own_items = []
+    item_count = 0
+    for item_id, product_id, title, price, is_sold, is_active, seller_id, seller_active in rows:
+        item_count += 1
+        item = {'id': str(item_id), 'product_id': str(product_id), 'title': title}
+        if is_sold or not is_active or not seller_active:
+            unavailable_items.append(item)
+        elif seller_id == user.id:
+            own_items.append(item)
+        else:
+            subtotal += price
+    return {
+        'item_count': item_count,
+        'subtotal': f"{subtotal:.2f}",
+        'unavailable_items': unavailable_items,
+        'own_items': own_items,
+    }
+
+
+def get_cart_summary(user):
+    """Return the cached cart summary for ``user``, computing it on a miss."""
+    return cart_summaries.get_or_set(str(user.id), lambda: build_cart_summary(user))
+
+
+def invalidate_cart_summary(*user_ids):
+    # Deleting after commit keeps a concurrent reader from re-caching pre-commit state.
+    keys = [str(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: cart_summaries.delete_many(keys))
+
+
+def invalidate_cart_summaries_for_products(product_ids):
+    """Drop the cached summary of every cart holding one of ``product_ids``."""
+    user_ids = Cart.objects.filter(items__product_id__in=product_ids).values_list('user_id', flat=True)
+    invalidate_cart_summary(*user_ids)
+
+
+def invalidate_cart_summaries_for_sellers(seller_ids):
+    """Drop the cached summary of every cart holding a product sold by one of ``seller_ids``."""
+    user_ids = Cart.objects.filter(items__product__seller_id__in=seller_ids).values_list('user_id', flat=True)
+    invalidate_cart_summary(*user_ids)
+
+
+@lru_cache(maxsize=4096)
+def _cart_owner(cart_id):
+    # A cart never changes owner, so one lookup per cart is enough.
+    return Cart.objects.filter(pk=cart_id).values_list('user_id', flat=True).first()
+
+
+def invalidate_cart_summaries_for_carts(cart_ids):
+    """Drop the cached summary of each cart in ``cart_ids``."""
+    invalidate_cart_summary(*filter(None, (_cart_owner(cart_id) for cart_id in set(cart_ids))))
@@ -0,0 +1,46 @@
+"""
+Read-replica routing.
+
+``ReplicaRoutingMiddleware`` marks safe-method requests as replica-readable
+in a context variable; ``ReplicaRouter`` then sends their reads to a random
+replica from ``DATABASE_REPLICAS``. Everything else stays on ``default``:
+writes, reads in unsafe requests, reads inside ``transaction.atomic`` and
+reads outside a request (commands, workers). After a successful write the
+middleware sets a short-lived cookie that pins the client to the primary,
+so users read their own writes despite replication lag.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def allow_replica_reads(allowed):
+    _replica_reads.set(allowed)
+
+
+def replica_reads_allowed():
+    return _replica_reads.get()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or not _replica_reads.get():
+            return 'default'
+        if connections['default'].in_atomic_block:
+            return 'default'
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -0,0 +1,126 @@
+"""
+Streaming data exports for finance.
+
+Rows are read with ``QuerySet.iterator(chunk_size=...)`` over a narrow
+``values_list`` (server-side cursors on PostgreSQL) and formatted one line
+at a time, so an export holds at most one chunk of rows in memory whatever
+its size. The same generators back the admin export endpoint and the
+``export_data`` management command.
+
+Under ASGI, Django 4.2 buffers a sync iterator given to
+StreamingHttpResponse into a list before sending it, so the endpoint
+streams ``aexport_lines`` instead, which pulls one chunk at a time through
+``sync_to_async``.
+"""
+import csv
+import json
+from datetime import datetime, time, timedelta
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import Order, Transaction
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+# Column name -> lookup, per exportable dataset.
+EXPORTS = {
+    'transactions': (Transaction, {
+        'id': 'id',
+        'created_at': 'created_at',
+        'product_id': 'product_id',
+        'product_title': 'product__title',
+        'buyer_id': 'buyer_id',
+        'buyer_username': 'buyer__username',
+        'seller_id': 'seller_id',
+        'seller_username': 'seller__username',
+        'payment_method': 'payment_method',
+        'amount': 'amount',
+        'transaction_status': 'transaction_status',
+    }),
+    'orders': (Order, {
+        'id': 'id',
+        'created_at': 'created_at',
+        'user_id': 'user_id',
+        'username': 'user__username',
+        'status': 'status',
+        'total': 'total',
+    }),
+}
+
+
+def export_queryset(dataset, start=None, end=None):
+    """
+    Rows of ``dataset`` created between the inclusive local dates ``start``
+    and ``end``, oldest first, as tuples in column order.
+    """
+    model, columns = EXPORTS[dataset]
+    queryset = model.objects.all()
+    if start:
+        queryset = queryset.filter(created_at__gte=timezone.make_aware(datetime.combine(start, time.min)))
+    if end:
+        queryset = queryset.filter(
+            created_at__lt=timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
+        )
+    return queryset.order_by('created_at', 'id').values_list(*columns.values())
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_lines(columns, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _jsonl_lines(columns, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+def export_lines(dataset, export_format, start=None, end=None, chunk_size=None):
+    """Yield the export of ``dataset`` as ``export_format`` text lines."""
+    chunk_size = chunk_size or settings.DATA_EXPORT['CHUNK_SIZE']
+    columns = list(EXPORTS[dataset][1])
+    rows = export_queryset(dataset, start, end).iterator(chunk_size=chunk_size)
+    if export_format == 'csv':
+        return _csv_lines(columns, rows)
+    return _jsonl_lines(columns, rows)
+
+
+async def aexport_lines(dataset, export_format, start=None, end=None, chunk_size=None):
+    """
+    ``export_lines`` as an async iterator yielding one chunk of lines at a time.
+
+    Every chunk is read on the request's thread-sensitive worker, so the
+    server-side cursor stays on the connection that opened it.
+    """
+    chunk_size = chunk_size or settings.DATA_EXPORT['CHUNK_SIZE']
+    lines = export_lines(dataset, export_format, start, end, chunk_size)
+    next_chunk = sync_to_async(lambda: ''.join(islice(lines, chunk_size)))
+    try:
+        while chunk := await next_chunk():
+            yield chunk
+    finally:
+        await sync_to_async(lines.close)()
+
+
+def export_filename(dataset, export_format, start=None, end=None):
+    parts = [dataset]
+    if start:
+        parts.append(f"from-{start:%Y-%m-%d}")
+    if end:
+        parts.append(f"to-{end:%Y-%m-%d}")
+    return f"{'_'.join(parts)}.{export_format}"
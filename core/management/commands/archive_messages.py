@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.archive import archive_cutoff, archive_messages
+
+
+class Command(BaseCommand):
+    help = "Move chat messages older than the archive horizon into the archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=settings.MESSAGE_ARCHIVE['AFTER_DAYS'],
+                            help="Archive messages sent more than this many days ago.")
+        parser.add_argument('--batch-size', type=int, default=settings.MESSAGE_ARCHIVE['BATCH_SIZE'],
+                            help="Messages moved per transaction.")
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help="Stop after this many batches (default: run until done).")
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options['older_than_days'])
+        moved = archive_messages(cutoff, batch_size=options['batch_size'], max_batches=options['max_batches'])
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} message(s) sent before {cutoff:%Y-%m-%d %H:%M}."))
@@ -0,0 +1,156 @@
+import asyncio
+import io
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.models import Category, Product, User
+
+HOST = 'benchmark.local'
+ENDPOINTS = {
+    'products': ('/api/products/', '/api/async/products'),
+    'categories': ('/api/categories/', '/api/async/categories'),
+    'inbox': ('/api/conversations/inbox/', '/api/async/conversations/inbox'),
+}
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Command(BaseCommand):
+    help = ("Benchmark one read endpoint in-process: WSGI (sync view, thread pool), ASGI with the sync DRF "
+            "view, and ASGI with its native async twin, at the same worker count and offered concurrency. "
+            "Sample rows are committed and deleted afterwards, so it only runs under DEBUG or with "
+            "--allow-db-writes.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='products')
+        parser.add_argument('--requests', type=int, default=400, help="Requests per mode.")
+        parser.add_argument('--concurrency', type=int, default=50, help="Requests in flight at once.")
+        parser.add_argument('--workers', type=int, default=4,
+                            help="WSGI worker threads, and the ASGI server's thread pool size.")
+        parser.add_argument('--products', type=int, default=50, help="Sample products to create.")
+        parser.add_argument('--allow-db-writes', action='store_true',
+                            help="Run even though DEBUG is off; sample rows are written to the database.")
+
+    # ---------------------------------------------------
+    # Sample data
+    # ---------------------------------------------------
+    def create_sample(self, products):
+        suffix = uuid.uuid4().hex[:8]
+        seller = User.objects.create_user(f"bench-seller-{suffix}", f"bench-seller-{suffix}@example.com")
+        buyer = User.objects.create_user(f"bench-buyer-{suffix}", f"bench-buyer-{suffix}@example.com")
+        category = Category.objects.create(name=f"Benchmark {suffix}")
+        Product.objects.bulk_create([
+            Product(seller=seller, category=category, title=f"Benchmark product {i}", description="Used item. " * 10,
+                    price=Decimal('10.00') + i, condition='Used')
+            for i in range(products)
+        ])
+        return buyer, [seller, buyer], category
+
+    # ---------------------------------------------------
+    # Drivers
+    # ---------------------------------------------------
+    def run_wsgi(self, path, cookie, total, workers):
+        from SwapNest.wsgi import application
+
+        def one(submitted):
+            status = []
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+                'SERVER_NAME': HOST, 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1', 'HTTP_HOST': HOST,
+                'HTTP_COOKIE': cookie, 'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http',
+                'wsgi.input': io.BytesIO(b''), 'wsgi.errors': sys.stderr, 'wsgi.multithread': True,
+                'wsgi.multiprocess': False, 'wsgi.run_once': False,
+            }
+            body = application(environ, lambda code, headers, exc_info=None: status.append(code))
+            b''.join(body)
+            if hasattr(body, 'close'):
+                body.close()
+            return time.perf_counter() - submitted, status[0].startswith('200')
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            start = time.perf_counter()
+            futures = [pool.submit(one, time.perf_counter()) for _ in range(total)]
+            results = [future.result() for future in futures]
+        return time.perf_counter() - start, results
+
+    def run_asgi(self, path, cookie, total, workers, concurrency):
+        from SwapNest.asgi import application
+
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+            'headers': [(b'host', HOST.encode()), (b'cookie', cookie.encode())],
+            'client': ('127.0.0.1', 50000), 'server': (HOST, 80),
+        }
+
+        async def one(limit):
+            async with limit:
+                started = time.perf_counter()
+                sent = []
+                request_sent = False
+
+                async def receive():
+                    nonlocal request_sent
+                    if not request_sent:
+                        request_sent = True
+                        return {'type': 'http.request', 'body': b'', 'more_body': False}
+                    await asyncio.Event().wait()
+
+                async def send(message):
+                    sent.append(message)
+
+                await application(dict(scope), receive, send)
+                return time.perf_counter() - started, sent[0]['status'] == 200
+
+        async def main():
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=workers))
+            limit = asyncio.Semaphore(concurrency)
+            start = time.perf_counter()
+            results = await asyncio.gather(*(one(limit) for _ in range(total)))
+            return time.perf_counter() - start, results
+
+        return asyncio.run(main())
+
+    def report(self, label, elapsed, results):
+        latencies = [latency * 1000 for latency, _ in results]
+        errors = sum(1 for _, ok in results if not ok)
+        self.stdout.write(
+            f"{label:<26}{len(results) / elapsed:>9.1f}{_percentile(latencies, 0.5):>9.1f}"
+            f"{_percentile(latencies, 0.99):>9.1f}{errors:>8}"
+        )
+
+    def handle(self, *args, **options):
+        # Unlike benchmark_renderers this cannot roll back a transaction: the
+        # requests run on worker threads with their own connections, which
+        # only see committed rows.
+        if not settings.DEBUG and not options['allow_db_writes']:
+            raise CommandError("This benchmark writes sample rows to the database; run it with DEBUG on "
+                               "or pass --allow-db-writes.")
+        sync_path, async_path = ENDPOINTS[options['endpoint']]
+        total, workers, concurrency = options['requests'], options['workers'], options['concurrency']
+        user, users, category = self.create_sample(options['products'])
+        cookie = f"access_token={RefreshToken.for_user(user).access_token}"
+        try:
+            with override_settings(ALLOWED_HOSTS=[HOST]):
+                self.stdout.write(
+                    f"{options['endpoint']}: {total} requests, concurrency {concurrency}, {workers} workers\n"
+                )
+                self.stdout.write(f"{'mode':<26}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}")
+                self.report('WSGI  sync DRF view', *self.run_wsgi(sync_path, cookie, total, workers))
+                self.report('ASGI  sync DRF view', *self.run_asgi(sync_path, cookie, total, workers, concurrency))
+                self.report('ASGI  native async view', *self.run_asgi(async_path, cookie, total, workers, concurrency))
+        finally:
+            Product.objects.filter(category=category).delete()
+            category.delete()
+            User.objects.filter(pk__in=[u.pk for u in users]).delete()
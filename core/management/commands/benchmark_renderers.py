@@ -0,0 +1,72 @@
+import io
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Category, Product, ProductImage, User
+from core.renderers import MessagePackRenderer, ORJSONParser, ORJSONRenderer
+from core.serializers import ProductSerializer
+
+
+class Command(BaseCommand):
+    help = ("Compare render (and JSON parse) time of DRF's JSON renderer, the orjson renderer and "
+            "MessagePack on a ProductSerializer payload. Sample rows are created and rolled back.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=200, help="Products in the payload.")
+        parser.add_argument('--images', type=int, default=3, help="Images per product.")
+        parser.add_argument('--repeat', type=int, default=50, help="Timed iterations per renderer.")
+
+    def build_payload(self, products, images):
+        with transaction.atomic():
+            seller = User.objects.create_user('benchmark-seller', 'benchmark-seller@example.com')
+            category = Category.objects.create(name='Benchmark category')
+            rows = Product.objects.bulk_create([
+                Product(seller=seller, category=category, title=f"Benchmark product {i}",
+                        description="A reasonably long description of a used item. " * 5,
+                        price=Decimal('19.99') + i, condition='Used', location='Lahore')
+                for i in range(products)
+            ])
+            ProductImage.objects.bulk_create([
+                ProductImage(product=product, image_url=f"https://cdn.example.com/p/{product.id}/{n}.jpg", order=n)
+                for product in rows for n in range(images)
+            ])
+            queryset = Product.objects.select_related('seller', 'category', 'bought_by').prefetch_related('images')
+            data = ProductSerializer(queryset.filter(seller=seller), many=True).data
+            transaction.set_rollback(True)
+        return data
+
+    def timed(self, function, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = function()
+        return (time.perf_counter() - start) / repeat * 1000, result
+
+    def handle(self, *args, **options):
+        data = self.build_payload(options['products'], options['images'])
+        repeat = options['repeat']
+        self.stdout.write(f"Payload: {len(data)} products, {options['images']} images each, {repeat} iterations\n")
+        self.stdout.write(f"{'renderer':<22}{'render ms':>11}{'size KiB':>10}{'parse ms':>10}")
+
+        results = {}
+        for name, renderer, parser in (
+            ('DRF JSONRenderer', JSONRenderer(), JSONParser()),
+            ('ORJSONRenderer', ORJSONRenderer(), ORJSONParser()),
+            ('MessagePackRenderer', MessagePackRenderer(), None),
+        ):
+            render_ms, body = self.timed(lambda: renderer.render(data, renderer.media_type, {}), repeat)
+            parse_ms = '-'
+            if parser is not None:
+                elapsed, _ = self.timed(lambda: parser.parse(io.BytesIO(body), parser.media_type, {}), repeat)
+                parse_ms = f"{elapsed:.2f}"
+            results[name] = render_ms
+            self.stdout.write(f"{name:<22}{render_ms:>11.2f}{len(body) / 1024:>10.1f}{parse_ms:>10}")
+
+        baseline = results['DRF JSONRenderer']
+        self.stdout.write(self.style.SUCCESS(
+            f"orjson renders {baseline / results['ORJSONRenderer']:.1f}x faster than DRF's JSONRenderer."
+        ))
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cache import (
+    STAT_FIELDS, flush_namespace, local_stats, namespace_version, publish_stats,
+    registered_namespaces, reset_stats, shared_stats
+)
+
+
+class Command(BaseCommand):
+    help = "Show hit/miss/latency statistics for cache namespaces, or flush them."
+
+    def add_arguments(self, parser):
+        parser.add_argument('namespaces', nargs='*',
+                            help="Namespaces to act on (default: every registered namespace).")
+        parser.add_argument('--flush', action='store_true',
+                            help="Invalidate all entries of the selected namespaces.")
+        parser.add_argument('--reset-stats', action='store_true',
+                            help="Zero the shared statistics of the selected namespaces.")
+
+    def handle(self, *args, **options):
+        registered = registered_namespaces()
+        namespaces = options['namespaces'] or sorted(registered)
+        unknown = [namespace for namespace in namespaces if namespace not in registered]
+        if unknown and not options['flush']:
+            raise CommandError(f"Unknown namespace(s): {', '.join(unknown)}")
+
+        if options['flush']:
+            for namespace in namespaces:
+                version = flush_namespace(namespace)
+                self.stdout.write(self.style.SUCCESS(f"Flushed {namespace} (now version {version})."))
+            return
+        if options['reset_stats']:
+            for namespace in namespaces:
+                reset_stats(namespace)
+                self.stdout.write(self.style.SUCCESS(f"Reset statistics for {namespace}."))
+            return
+
+        publish_stats()
+        self.stdout.write(f"{'namespace':<24}{'version':>8}{'hits':>10}{'misses':>10}{'hit %':>8}{'avg ms':>9}")
+        for namespace in namespaces:
+            stats = shared_stats(namespace)
+            if not any(stats.values()):
+                stats = local_stats().get(namespace, dict.fromkeys(STAT_FIELDS, 0))
+            lookups = stats['hits'] + stats['misses']
+            ratio = f"{100 * stats['hits'] / lookups:.1f}" if lookups else '-'
+            latency = f"{stats['latency_us'] / stats['calls'] / 1000:.2f}" if stats['calls'] else '-'
+            self.stdout.write(
+                f"{namespace:<24}{namespace_version(namespace):>8}{stats['hits']:>10}"
+                f"{stats['misses']:>10}{ratio:>8}{latency:>9}"
+            )
@@ -0,0 +1,30 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.outbox import dispatch_pending
+
+
+class Command(BaseCommand):
+    help = "Deliver pending outbox events written by checkout."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE,
+                            help="Maximum number of events handled per batch.")
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep running and poll for new events instead of exiting once drained.")
+        parser.add_argument('--interval', type=float, default=settings.OUTBOX_POLL_INTERVAL,
+                            help="Seconds to sleep between polls when the outbox is empty (with --loop).")
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            handled = dispatch_pending(batch_size=options['batch_size'])
+            total += handled
+            if handled:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f"Dispatched {total} outbox event(s)."))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from core.exports import EXPORT_FORMATS, EXPORTS, export_lines
+
+
+class Command(BaseCommand):
+    help = "Stream transactions or orders to a CSV or JSONL file (or stdout)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(EXPORTS))
+        parser.add_argument('--output-format', choices=sorted(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--start', help="First day to include (YYYY-MM-DD).")
+        parser.add_argument('--end', help="Last day to include (YYYY-MM-DD).")
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help="Rows fetched from the database per round trip.")
+        parser.add_argument('--file', default=None, help="Write to this path instead of stdout.")
+
+    def _date(self, value, name):
+        if value is None:
+            return None
+        try:
+            day = parse_date(value)
+        except ValueError:
+            # Well-formed but impossible, e.g. 2024-02-30.
+            day = None
+        if day is None:
+            raise CommandError(f"--{name} must be a valid date in YYYY-MM-DD format.")
+        return day
+
+    def handle(self, *args, **options):
+        start = self._date(options['start'], 'start')
+        end = self._date(options['end'], 'end')
+        lines = export_lines(
+            options['dataset'], options['output_format'],
+            start=start, end=end, chunk_size=options['chunk_size']
+        )
+        if options['file']:
+            with open(options['file'], 'w', newline='', encoding='utf-8') as out:
+                out.writelines(lines)
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['file']}."))
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
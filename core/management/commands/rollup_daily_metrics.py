@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.rollups import rollup_daily_metrics
+
+
+class Command(BaseCommand):
+    help = "Incrementally update the daily marketplace metrics used by the admin dashboard."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help="Ignore the checkpoint and rebuild metrics for all history.")
+        parser.add_argument('--recent-days', type=int, default=0,
+                            help="Also recompute this many trailing days to pick up late changes.")
+
+    def handle(self, *args, **options):
+        days = rollup_daily_metrics(full=options['full'], recent_days=options['recent_days'])
+        self.stdout.write(self.style.SUCCESS(f"Recomputed metrics for {len(days)} day(s)."))
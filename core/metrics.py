@@ -0,0 +1,320 @@
+"""
+In-process Prometheus metrics.
+
+Counters and histograms are plain dictionaries guarded by one lock, so
+recording a sample is a dictionary update. ``MetricsMiddleware`` records
+per-route request counts, latency histograms and query counts; other code
+records domain events (e.g. ``CHECKOUTS.inc(outcome='success')``).
+
+``metrics_view`` serves the text exposition format at ``/metrics`` to
+scrapers presenting METRICS['TOKEN'] (or to anyone under DEBUG). With
+several worker processes, set METRICS['MULTIPROC_DIR']: every process then
+writes a snapshot of its samples there (at most every SNAPSHOT_INTERVAL
+seconds and at exit) and the endpoint sums the snapshots of all processes,
+so any worker can answer a scrape. Empty the directory when deploying, as
+prometheus_client's multiprocess mode also requires.
+"""
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_snapshot_lock = threading.Lock()
+_metrics = {}
+_collectors = []
+_query_count = ContextVar('metrics_query_count', default=None)
+_last_snapshot = 0.0
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.values = {}
+        _metrics[name] = self
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[label]) for label in self.labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        _maybe_snapshot()
+
+    def samples(self):
+        return {json.dumps(key): value for key, value in self.values.items()}
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # key -> [count per bucket..., +Inf count, sum]
+        self.values = {}
+        _metrics[name] = self
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[label]) for label in self.labels)
+        with _lock:
+            counts = self.values.get(key)
+            if counts is None:
+                counts = self.values[key] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            counts[-2] += 1
+            counts[-1] += value
+        _maybe_snapshot()
+
+    def samples(self):
+        return {json.dumps(key): list(counts) for key, counts in self.values.items()}
+
+
+def register_collector(collector):
+    """
+    Register a callable run before every snapshot and scrape, to copy
+    values kept elsewhere (e.g. cache statistics) into metrics.
+    """
+    _collectors.append(collector)
+
+
+# ---------------------------------------------------
+# Application metrics
+# ---------------------------------------------------
+REQUESTS = Counter('swapnest_http_requests_total', "HTTP responses by route, method and status.",
+                   ('route', 'method', 'status'))
+LATENCY = Histogram('swapnest_http_request_duration_seconds', "Request latency by route.",
+                    ('route', 'method'))
+DB_QUERIES = Histogram('swapnest_http_request_db_queries', "Database queries per request by route.",
+                       ('route',), buckets=(0, 1, 2, 5, 10, 20, 50, 100))
+CHECKOUTS = Counter('swapnest_checkouts_total',
+                    "Checkout attempts by outcome (success, conflict, insufficient_funds, rejected).",
+                    ('outcome',))
+CACHE_REQUESTS = Counter('swapnest_cache_requests_total', "Cache lookups by namespace and result.",
+                         ('namespace', 'result'))
+
+
+def _collect_cache_stats():
+    from .cache import local_stats
+
+    for namespace, stats in local_stats().items():
+        with _lock:
+            CACHE_REQUESTS.values[(namespace, 'hit')] = stats['hits']
+            CACHE_REQUESTS.values[(namespace, 'miss')] = stats['misses']
+
+
+register_collector(_collect_cache_stats)
+
+
+# ---------------------------------------------------
+# Multiprocess snapshots
+# ---------------------------------------------------
+def _snapshot_dir():
+    directory = settings.METRICS['MULTIPROC_DIR']
+    return Path(directory) if directory else None
+
+
+def _local_samples():
+    for collector in _collectors:
+        collector()
+    with _lock:
+        return {name: metric.samples() for name, metric in _metrics.items()}
+
+
+def _write_snapshot(directory):
+    directory.mkdir(parents=True, exist_ok=True)
+    # A unique temporary name, so a crashed writer never leaves a file another one renames.
+    with tempfile.NamedTemporaryFile('w', dir=directory, suffix='.tmp', delete=False) as temporary:
+        temporary.write(json.dumps(_local_samples()))
+    try:
+        os.replace(temporary.name, directory / f"{os.getpid()}.json")
+    except OSError:
+        os.unlink(temporary.name)
+        raise
+
+
+def write_snapshot():
+    directory = _snapshot_dir()
+    if directory is None:
+        return
+    with _snapshot_lock:
+        _write_snapshot(directory)
+
+
+def _maybe_snapshot():
+    """Write a snapshot if the interval has passed; never raises into the request."""
+    global _last_snapshot
+    directory = _snapshot_dir()
+    if directory is None:
+        return
+    # Another thread is writing one right now; this sample makes the next.
+    if not _snapshot_lock.acquire(blocking=False):
+        return
+    try:
+        now = time.monotonic()
+        if now - _last_snapshot < settings.METRICS['SNAPSHOT_INTERVAL']:
+            return
+        _last_snapshot = now
+        _write_snapshot(directory)
+    except OSError:
+        logger.exception("Could not write metrics snapshot to %s", directory)
+    finally:
+        _snapshot_lock.release()
+
+
+def _write_final_snapshot():
+    if not settings.configured:
+        return
+    try:
+        write_snapshot()
+    except OSError:
+        logger.exception("Could not write final metrics snapshot")
+
+
+atexit.register(_write_final_snapshot)
+
+
+def _merge(total, samples):
+    for name, series in samples.items():
+        merged = total.setdefault(name, {})
+        for key, value in series.items():
+            if isinstance(value, list):
+                current = merged.get(key)
+                merged[key] = value if current is None else [a + b for a, b in zip(current, value)]
+            else:
+                merged[key] = merged.get(key, 0) + value
+    return total
+
+
+def gather():
+    """Samples of this process, plus those of every other process with a snapshot."""
+    local = _local_samples()
+    directory = _snapshot_dir()
+    if directory is None:
+        return local
+    total = _merge({}, local)
+    own = f"{os.getpid()}.json"
+    for path in directory.glob('*.json'):
+        if path.name == own:
+            continue
+        try:
+            _merge(total, json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return total
+
+
+# ---------------------------------------------------
+# Exposition
+# ---------------------------------------------------
+def _label_text(names, key, extra=()):
+    pairs = list(zip(names, json.loads(key))) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_metrics():
+    samples = gather()
+    lines = []
+    for name, metric in _metrics.items():
+        lines.append(f"# HELP {name} {metric.documentation}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        for key, value in sorted(samples.get(name, {}).items()):
+            if metric.kind == 'counter':
+                lines.append(f"{name}{_label_text(metric.labels, key)} {_format_value(value)}")
+                continue
+            # Bucket counts are stored cumulatively already.
+            for bound, count in zip(metric.buckets, value):
+                labels = _label_text(metric.labels, key, [('le', _format_value(bound))])
+                lines.append(f"{name}_bucket{labels} {count}")
+            labels = _label_text(metric.labels, key, [('le', '+Inf')])
+            lines.append(f"{name}_bucket{labels} {value[-2]}")
+            lines.append(f"{name}_count{_label_text(metric.labels, key)} {value[-2]}")
+            lines.append(f"{name}_sum{_label_text(metric.labels, key)} {_format_value(value[-1])}")
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint; requires ``Authorization: Bearer <TOKEN>``.
+    Without a configured token it is only served under DEBUG.
+    """
+    config = settings.METRICS
+    token = config['TOKEN']
+    if not config['ENABLED'] or not (token or settings.DEBUG):
+        raise Http404
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        return HttpResponse(status=401)
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# ---------------------------------------------------
+# Middleware
+# ---------------------------------------------------
+def _count_query(execute, sql, params, many, context):
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+def _install_query_counter(sender, connection, **kwargs):
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+class MetricsMiddleware(MiddlewareMixin):
+    """Record request count, latency and query count per URL name."""
+
+    def __init__(self, get_response):
+        if not settings.METRICS['ENABLED']:
+            raise MiddlewareNotUsed
+        connection_created.connect(_install_query_counter, dispatch_uid='core.metrics.query_counter')
+        for connection in connections.all(initialized_only=True):
+            _install_query_counter(None, connection)
+        super().__init__(get_response)
+
+    def process_request(self, request):
+        request._metrics_started = time.perf_counter()
+        request._metrics_queries = [0]
+        _query_count.set(request._metrics_queries)
+
+    def process_response(self, request, response):
+        started = getattr(request, '_metrics_started', None)
+        if started is None:
+            return response
+        _query_count.set(None)
+        match = getattr(request, 'resolver_match', None)
+        route = match.view_name if match else 'unmatched'
+        LATENCY.observe(time.perf_counter() - started, route=route, method=request.method)
+        DB_QUERIES.observe(request._metrics_queries[0], route=route)
+        REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+        return response
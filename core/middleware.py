@@ -1,18 +1,33 @@
-from django.utils.functional import SimpleLazyObject
-from rest_framework_simplejwt.tokens import AccessToken
-from rest_framework_simplejwt.exceptions import TokenError
-from rest_framework.response import Response
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
 from django.http import JsonResponse
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils.deprecation import MiddlewareMixin
 from datetime import datetime
+from urllib.parse import urlsplit
 import jwt
-from django.conf import settings
 
+from .db_router import allow_replica_reads
+from .profiling import timing
 
-class TokenRefreshMiddleware:
-    def __init__(self, get_response):
-        self.get_response = get_response
 
-    def __call__(self, request):
+class TokenRefreshMiddleware(MiddlewareMixin):
+    """
+    Transparently refresh an expired access token from the refresh token cookie.
+
+    Built on MiddlewareMixin so it works in both sync and async mode; async
+    views served through ASGI then run on the event loop instead of being
+    pushed through a sync adapter.
+    """
+
+    def process_request(self, request):
+        with timing('auth'):
+            self.refresh_tokens(request)
+
+    def refresh_tokens(self, request):
         access_token = request.COOKIES.get('access_token')
         refresh_token = request.COOKIES.get('refresh_token')
 
@@ -36,27 +51,8 @@ class TokenRefreshMiddleware:
                         request.COOKIES['access_token'] = new_access_token
                         request.COOKIES['refresh_token'] = new_refresh_token
 
-                        # Get the response
-                        response = self.get_response(request)
-
-                        # Set new cookies in response
-                        response.set_cookie(
-                            key='access_token',
-                            value=new_access_token,
-                            httponly=True,
-                            secure=True,
-                            samesite='None',
-                            path='/'
-                        )
-                        response.set_cookie(
-                            key='refresh_token',
-                            value=new_refresh_token,
-                            httponly=True,
-                            secure=True,
-                            samesite='None',
-                            path='/'
-                        )
-                        return response
+                        # Remember the new tokens so they can be set on the response
+                        request._refreshed_tokens = (new_access_token, new_refresh_token)
 
                     except Exception as e:
                         # If refresh token is invalid, let the authentication backend handle it
@@ -65,4 +61,147 @@ class TokenRefreshMiddleware:
             except (jwt.InvalidTokenError, jwt.ExpiredSignatureError):
                 pass
 
-        return self.get_response(request)
+    def process_response(self, request, response):
+        refreshed_tokens = getattr(request, '_refreshed_tokens', None)
+        if refreshed_tokens:
+            new_access_token, new_refresh_token = refreshed_tokens
+            # Set new cookies in response
+            response.set_cookie(
+                key='access_token',
+                value=new_access_token,
+                httponly=True,
+                secure=True,
+                samesite='None',
+                path='/'
+            )
+            response.set_cookie(
+                key='refresh_token',
+                value=new_refresh_token,
+                httponly=True,
+                secure=True,
+                samesite='None',
+                path='/'
+            )
+        return response
+
+
+class ReplicaRoutingMiddleware(MiddlewareMixin):
+    """
+    Let safe-method requests read from replicas (see core/db_router.py).
+
+    A successful unsafe request sets a pin cookie for
+    DATABASE_ROUTING['PIN_SECONDS']; while it is present the client's reads
+    stay on the primary so it sees its own writes.
+    """
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def process_request(self, request):
+        pinned = settings.DATABASE_ROUTING['PIN_COOKIE'] in request.COOKIES
+        allow_replica_reads(request.method in self.SAFE_METHODS and not pinned)
+
+    def process_response(self, request, response):
+        allow_replica_reads(False)
+        if request.method not in self.SAFE_METHODS and response.status_code < 400 and settings.DATABASE_REPLICAS:
+            # Browsers drop Secure cookies over plain HTTP, and SameSite=None
+            # requires Secure; the pin must stick either way.
+            secure = request.is_secure()
+            response.set_cookie(
+                key=settings.DATABASE_ROUTING['PIN_COOKIE'],
+                value='1',
+                max_age=settings.DATABASE_ROUTING['PIN_SECONDS'],
+                httponly=True,
+                secure=secure,
+                samesite='None' if secure else 'Lax',
+                path='/'
+            )
+        return response
+
+
+# ---------------------------------------------------
+# Path-aware middleware
+# ---------------------------------------------------
+def is_api_request(request):
+    return request.path_info.startswith(settings.API_PATH_PREFIX)
+
+
+class SkipForAPIMixin:
+    """
+    Pass API requests straight to the next layer, so the wrapped Django
+    middleware does no work for them. The API authenticates with
+    CookiesJWTAuthentication and has no use for sessions, messages, CSRF
+    tokens or frame options; the admin and other pages keep them.
+    """
+
+    def __call__(self, request):
+        if is_api_request(request):
+            # A coroutine in async mode, which the handler awaits as usual.
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SiteSessionMiddleware(SkipForAPIMixin, SessionMiddleware):
+    pass
+
+
+class SiteCsrfViewMiddleware(SkipForAPIMixin, CsrfViewMiddleware):
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if is_api_request(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class SiteAuthenticationMiddleware(SkipForAPIMixin, AuthenticationMiddleware):
+    pass
+
+
+class SiteMessageMiddleware(SkipForAPIMixin, MessageMiddleware):
+    pass
+
+
+class SiteXFrameOptionsMiddleware(SkipForAPIMixin, XFrameOptionsMiddleware):
+    pass
+
+
+class APIOriginCheckMiddleware(MiddlewareMixin):
+    """
+    CSRF protection for cookie-authenticated API writes.
+
+    The JWT cookies are SameSite=None, so browsers attach them to cross-site
+    requests. An unsafe API request carrying them is checked against what
+    the browser reports about its origin: the Origin header, else
+    Sec-Fetch-Site, else Referer. The origin must be this host or one of
+    API_TRUSTED_ORIGINS. Requests that report none of these come from
+    non-browser clients (mobile apps, servers), which cannot be driven
+    cross-site, and pass. So do requests without auth cookies, such as login.
+    """
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+    AUTH_COOKIES = ('access_token', 'refresh_token')
+    # Sec-Fetch-Site values that cannot come from another site's page.
+    FIRST_PARTY_FETCH_SITES = ('same-origin', 'none')
+
+    def process_request(self, request):
+        if request.method in self.SAFE_METHODS or not is_api_request(request):
+            return None
+        if not any(cookie in request.COOKIES for cookie in self.AUTH_COOKIES):
+            return None
+
+        origin = request.headers.get('Origin')
+        if origin is not None:
+            return self.check_origin(request, origin)
+        fetch_site = request.headers.get('Sec-Fetch-Site')
+        if fetch_site is not None and fetch_site in self.FIRST_PARTY_FETCH_SITES:
+            return None
+        referer = urlsplit(request.headers.get('Referer', ''))
+        if referer.scheme and referer.netloc:
+            return self.check_origin(request, f"{referer.scheme}://{referer.netloc}")
+        if fetch_site is not None:
+            return self.reject("Cross-site request without an Origin header.")
+        return None
+
+    def check_origin(self, request, origin):
+        if origin == f"{request.scheme}://{request.get_host()}" or origin in settings.API_TRUSTED_ORIGINS:
+            return None
+        return self.reject(f"Origin {origin} is not allowed.")
+
+    def reject(self, detail):
+        return JsonResponse({"error": "Forbidden", "detail": detail}, status=403)
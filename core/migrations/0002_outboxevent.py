@@ -0,0 +1,37 @@
+# Generated by Django 4.2 on 2026-10-19 03:02
+
+from django.db import migrations, models
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_remove_cartitem_quantity_alter_productimage_image_url'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='The time when the record was created.')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='The time when the record was last updated.')),
+                ('event_type', models.CharField(choices=[('OrderPlaced', 'Order Placed'), ('ItemSold', 'Item Sold'), ('BalanceCredited', 'Balance Credited')], max_length=30)),
+                ('payload', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Processed', 'Processed'), ('Failed', 'Failed')], default='Pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Number of delivery attempts made so far.')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time the next delivery attempt may run.')),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outboxevent',
+            index=models.Index(fields=['status', 'available_at'], name='outbox_status_available_idx'),
+        ),
+    ]
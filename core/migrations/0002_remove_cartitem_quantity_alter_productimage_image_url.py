@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-19 03:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Catch the migrations up with models.py, which already had no
+    CartItem.quantity and a longer ProductImage.image_url before the outbox
+    work. Kept apart from 0002_outboxevent so each can be rolled back alone.
+    """
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='cartitem',
+            name='quantity',
+        ),
+        migrations.AlterField(
+            model_name='productimage',
+            name='image_url',
+            field=models.URLField(max_length=1000),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-19 03:03
+
+from django.db import migrations, models
+
+
+def create_missing_carts(apps, schema_editor):
+    User = apps.get_model('core', 'User')
+    Cart = apps.get_model('core', 'Cart')
+    Cart.objects.bulk_create(
+        [Cart(user_id=user_id) for user_id in User.objects.filter(cart__isnull=True).values_list('id', flat=True)]
+    )
+
+
+def remove_duplicate_cart_items(apps, schema_editor):
+    CartItem = apps.get_model('core', 'CartItem')
+    seen = set()
+    duplicates = []
+    for item_id, cart_id, product_id in CartItem.objects.order_by('created_at').values_list('id', 'cart_id', 'product_id'):
+        if (cart_id, product_id) in seen:
+            duplicates.append(item_id)
+        else:
+            seen.add((cart_id, product_id))
+    CartItem.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_outboxevent'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_carts, migrations.RunPython.noop),
+        migrations.RunPython(remove_duplicate_cart_items, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(fields=('cart', 'product'), name='unique_cart_product'),
+        ),
+    ]
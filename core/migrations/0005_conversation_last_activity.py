@@ -0,0 +1,50 @@
+# Generated by Django 4.2 on 2026-10-19 03:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def backfill_last_activity(apps, schema_editor):
+    Conversation = apps.get_model('core', 'Conversation')
+    Message = apps.get_model('core', 'Message')
+    for conversation in Conversation.objects.all().iterator():
+        latest = Message.objects.filter(conversation=conversation).order_by('-created_at', '-id').first()
+        if latest is None:
+            conversation.last_activity_at = conversation.created_at
+        else:
+            conversation.last_activity_at = latest.created_at
+            conversation.last_message_preview = latest.content[:255]
+            conversation.last_message_sender_id = latest.sender_id
+        conversation.save(update_fields=['last_activity_at', 'last_message_preview', 'last_message_sender'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_message_conversation_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='last_activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Time of the latest message, or of creation if there is none.'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_preview',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_sender',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_last_activity, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['last_activity_at', 'id'], name='conversation_activity_idx'),
+        ),
+    ]
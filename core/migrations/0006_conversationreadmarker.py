@@ -0,0 +1,49 @@
+# Generated by Django 4.2 on 2026-10-19 03:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+def create_read_markers(apps, schema_editor):
+    Conversation = apps.get_model('core', 'Conversation')
+    ConversationReadMarker = apps.get_model('core', 'ConversationReadMarker')
+    Message = apps.get_model('core', 'Message')
+    Membership = Conversation.participants.through
+    markers = []
+    for conversation_id, user_id in Membership.objects.values_list('conversation_id', 'user_id').iterator():
+        unread = Message.objects.filter(
+            conversation_id=conversation_id, read_status=False
+        ).exclude(sender_id=user_id).count()
+        markers.append(ConversationReadMarker(
+            conversation_id=conversation_id, user_id=user_id, unread_count=unread
+        ))
+    ConversationReadMarker.objects.bulk_create(markers, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_conversation_last_activity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationReadMarker',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='The time when the record was created.')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='The time when the record was last updated.')),
+                ('last_read_at', models.DateTimeField(blank=True, help_text='Messages up to this time have been read.', null=True)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_markers', to='core.conversation')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_markers', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='conversationreadmarker',
+            constraint=models.UniqueConstraint(fields=('conversation', 'user'), name='unique_read_marker'),
+        ),
+        migrations.RunPython(create_read_markers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2 on 2026-10-19 03:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_buyer_seller(apps, schema_editor):
+    """
+    Key existing product conversations on (product, buyer, seller) and make sure
+    the seller is a participant. Only the oldest conversation per key is keyed;
+    later duplicates stay legacy (null buyer/seller) and keep working as before.
+    """
+    Conversation = apps.get_model('core', 'Conversation')
+    ConversationReadMarker = apps.get_model('core', 'ConversationReadMarker')
+    seen = set()
+    conversations = Conversation.objects.filter(product__isnull=False).select_related('product').order_by('created_at')
+    for conversation in conversations.iterator():
+        seller_id = conversation.product.seller_id
+        participant_ids = set(conversation.participants.values_list('id', flat=True))
+        buyer_ids = sorted(str(user_id) for user_id in participant_ids - {seller_id})
+        if seller_id not in participant_ids:
+            conversation.participants.add(seller_id)
+            ConversationReadMarker.objects.get_or_create(conversation=conversation, user_id=seller_id)
+        if len(buyer_ids) != 1:
+            continue
+        key = (conversation.product_id, buyer_ids[0], seller_id)
+        if key in seen:
+            continue
+        seen.add(key)
+        conversation.buyer_id = buyer_ids[0]
+        conversation.seller_id = seller_id
+        conversation.save(update_fields=['buyer', 'seller'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_archivedmessage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='buyer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='buyer_conversations', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='seller',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='seller_conversations', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_buyer_seller, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.UniqueConstraint(fields=('product', 'buyer', 'seller'), name='unique_product_conversation'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-19 03:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_message_created_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['buyer', 'created_at', 'id'], name='transaction_buyer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['seller', 'created_at', 'id'], name='transaction_seller_created_idx'),
+        ),
+    ]
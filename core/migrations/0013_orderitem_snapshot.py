@@ -0,0 +1,52 @@
+# Generated by Django 4.2 on 2026-10-19 03:18
+
+from django.db import migrations, models
+
+
+def backfill_snapshots(apps, schema_editor):
+    OrderItem = apps.get_model('core', 'OrderItem')
+    ProductImage = apps.get_model('core', 'ProductImage')
+    items = OrderItem.objects.filter(product__isnull=False).select_related('product__seller')
+    for item in items.iterator(chunk_size=500):
+        product = item.product
+        image = ProductImage.objects.filter(product=product).order_by('order').first()
+        item.product_title = product.title
+        item.product_condition = product.condition
+        item.product_image_url = image.image_url if image else ''
+        item.seller_name = product.seller.username
+        item.save(update_fields=['product_title', 'product_condition', 'product_image_url', 'seller_name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_transaction_role_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='product_condition',
+            field=models.CharField(blank=True, choices=[('New', 'New'), ('Used', 'Used')], default='', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='product_image_url',
+            field=models.URLField(blank=True, default='', max_length=1000),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='product_title',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='seller_name',
+            field=models.CharField(blank=True, default='', max_length=150),
+        ),
+        migrations.RunPython(backfill_snapshots, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='order_user_created_idx'),
+        ),
+    ]
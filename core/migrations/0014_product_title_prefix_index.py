@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-19 03:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_orderitem_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['title'], name='product_title_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -1,6 +1,9 @@
 import uuid
+from collections import Counter
 from decimal import Decimal
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Greatest, Upper
+from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 
 # ---------------------------------------------------
@@ -42,6 +45,18 @@ ORDER_STATUS_CHOICES = [
     ('Cancelled', 'Cancelled'),
 ]
 
+OUTBOX_EVENT_CHOICES = [
+    ('OrderPlaced', 'Order Placed'),
+    ('ItemSold', 'Item Sold'),
+    ('BalanceCredited', 'Balance Credited'),
+]
+
+OUTBOX_STATUS_CHOICES = [
+    ('Pending', 'Pending'),
+    ('Processed', 'Processed'),
+    ('Failed', 'Failed'),
+]
+
 
 # ---------------------------------------------------
 # Abstract Base Model for UUID Primary Key and Timestamps
@@ -64,7 +79,8 @@ class UUIDTimeStampedModel(models.Model):
 class UserManager(BaseUserManager):
     def create_user(self, username, email, password=None, role='User', **extra_fields):
         """
-        Create and save a User with the given username, email, password, and role.
+        Create and save a User with the given username, email, password, and role,
+        along with the user's (empty) cart.
         """
         if not username:
             raise ValueError('The Username must be set')
@@ -73,7 +89,10 @@ class UserManager(BaseUserManager):
         email = self.normalize_email(email)
         user = self.model(username=username, email=email, role=role, **extra_fields)
         user.set_password(password)
-        user.save(using=self._db)
+        with transaction.atomic(using=self._db):
+            user.save(using=self._db)
+            # Every user gets a cart up front so cart requests only ever read it.
+            Cart.objects.using(self._db).create(user=user)
         return user
 
     def create_superuser(self, username, email, password=None, **extra_fields):
@@ -126,6 +145,12 @@ class User(AbstractBaseUser, PermissionsMixin, UUIDTimeStampedModel):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='user_created_idx'),
+            # Serve the admin's case-insensitive (iexact) lookups on PostgreSQL.
+            models.Index(Upper('username'), name='user_username_upper_idx'),
+            models.Index(Upper('email'), name='user_email_upper_idx'),
+        ]
 
 
 # ---------------------------------------------------
@@ -171,6 +196,9 @@ class Product(UUIDTimeStampedModel):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='product_created_idx'),
+        ]
 
 
 # ---------------------------------------------------
@@ -211,6 +239,12 @@ class Transaction(UUIDTimeStampedModel):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='transaction_created_idx'),
+            # Per-role history, seeked by (created_at, id) keyset cursors.
+            models.Index(fields=['buyer', 'created_at', 'id'], name='transaction_buyer_created_idx'),
+            models.Index(fields=['seller', 'created_at', 'id'], name='transaction_seller_created_idx'),
+        ]
 
 
 # ---------------------------------------------------
@@ -240,6 +274,12 @@ class Report(UUIDTimeStampedModel):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Moderation queue: pending reports by age and grouped per target.
+            models.Index(fields=['status', 'created_at'], name='report_status_created_idx'),
+            models.Index(fields=['status', 'reported_product'], name='report_status_product_idx'),
+            models.Index(fields=['status', 'reported_user'], name='report_status_user_idx'),
+        ]
 
 
 # ---------------------------------------------------
@@ -253,12 +293,94 @@ class Conversation(UUIDTimeStampedModel):
         Product, on_delete=models.CASCADE, related_name='conversations', blank=True, null=True
     )
     participants = models.ManyToManyField(User, related_name='conversations')
+    # Product conversations are keyed on (product, buyer, seller) so a buyer
+    # always reuses the same thread; both are null for legacy conversations.
+    buyer = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='buyer_conversations', blank=True, null=True
+    )
+    seller = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='seller_conversations', blank=True, null=True
+    )
+    # Denormalized from the latest message so the inbox never has to scan messages.
+    last_activity_at = models.DateTimeField(
+        default=timezone.now, help_text="Time of the latest message, or of creation if there is none."
+    )
+    last_message_preview = models.CharField(max_length=255, blank=True, default='')
+    last_message_sender = models.ForeignKey(
+        User, on_delete=models.SET_NULL, related_name='+', blank=True, null=True
+    )
 
     def __str__(self):
         return f"Conversation for {self.product.title}" if self.product else f"Conversation {self.id}"
 
+    def has_participant(self, user):
+        """Indexed EXISTS on the membership table instead of loading all participants."""
+        return Conversation.participants.through.objects.filter(conversation_id=self.pk, user_id=user.pk).exists()
+
+    def add_participants(self, *users):
+        """Add users to the conversation along with their read markers."""
+        self.participants.add(*users)
+        ConversationReadMarker.objects.bulk_create(
+            [ConversationReadMarker(conversation=self, user=user) for user in users],
+            ignore_conflicts=True
+        )
+
+    def record_message(self, message):
+        """
+        Update the denormalized last-message columns and bump every other
+        participant's unread counter, one UPDATE each.
+        """
+        Conversation.objects.filter(pk=self.pk).update(
+            last_activity_at=message.created_at,
+            last_message_preview=message.content[:255],
+            last_message_sender=message.sender,
+        )
+        ConversationReadMarker.objects.filter(conversation=self).exclude(user=message.sender).update(
+            unread_count=models.F('unread_count') + 1
+        )
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['last_activity_at', 'id'], name='conversation_activity_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'buyer', 'seller'], name='unique_product_conversation'),
+        ]
+
+
+# ---------------------------------------------------
+# ConversationReadMarker Model (Chat)
+# ---------------------------------------------------
+class ConversationReadMarker(UUIDTimeStampedModel):
+    """
+    Per-participant read position and unread counter for a conversation,
+    so unread badges never require counting messages.
+    """
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='read_markers')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='read_markers')
+    last_read_at = models.DateTimeField(blank=True, null=True, help_text="Messages up to this time have been read.")
+    unread_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user.username} in {self.conversation_id} ({self.unread_count} unread)"
+
+    @classmethod
+    def forget_unread(cls, unread_messages):
+        """
+        Take unread messages that leave the hot table (deleted or archived)
+        off the counters of the participants they were unread for.
+        ``unread_messages`` are ``(conversation_id, sender_id)`` pairs.
+        """
+        for (conversation_id, sender_id), count in Counter(unread_messages).items():
+            cls.objects.filter(conversation_id=conversation_id).exclude(user_id=sender_id).update(
+                unread_count=Greatest(models.F('unread_count') - count, 0)
+            )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['conversation', 'user'], name='unique_read_marker'),
+        ]
 
 
 # ---------------------------------------------------
@@ -280,6 +402,42 @@ class Message(UUIDTimeStampedModel):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Serves per-conversation cursor pagination and incremental sync.
+            models.Index(fields=['conversation', 'created_at', 'id'], name='message_conv_created_idx'),
+            # Global time order: archival batches and the admin changelist.
+            models.Index(fields=['created_at', 'id'], name='message_created_idx'),
+        ]
+
+
+# ---------------------------------------------------
+# ArchivedMessage Model (Chat)
+# ---------------------------------------------------
+class ArchivedMessage(models.Model):
+    """
+    A message moved out of the hot Message table by the archive_messages
+    command. Keeps the original id and timestamps so history reads continue
+    seamlessly from the archive (see core/archive.py).
+    """
+    id = models.UUIDField(primary_key=True, editable=False)
+    conversation = models.ForeignKey(
+        Conversation, on_delete=models.CASCADE, related_name='archived_messages'
+    )
+    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_messages')
+    content = models.TextField()
+    read_status = models.BooleanField(default=False)
+    created_at = models.DateTimeField(help_text="When the original message was sent.")
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived message {self.id}"
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['conversation', 'created_at', 'id'], name='archived_conv_created_idx'),
+        ]
 
 
 # ---------------------------------------------------
@@ -308,6 +466,11 @@ class CartItem(UUIDTimeStampedModel):
     def __str__(self):
         return f"{self.product.title}"
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['cart', 'product'], name='unique_cart_product'),
+        ]
+
 
 # ---------------------------------------------------
 # Order Model
@@ -325,6 +488,10 @@ class Order(UUIDTimeStampedModel):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='order_created_idx'),
+            models.Index(fields=['user', 'created_at', 'id'], name='order_user_created_idx'),
+        ]
 
 
 # ---------------------------------------------------
@@ -333,12 +500,113 @@ class Order(UUIDTimeStampedModel):
 class OrderItem(UUIDTimeStampedModel):
     """
     Represents an individual item within an order.
+
+    The product details shown in order history are also copied onto the item
+    at checkout and served from there by the API, so they survive later
+    edits or deletion of the listing.
     """
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
     product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True)
     quantity = models.PositiveIntegerField(default=1)
     price = models.DecimalField(max_digits=10, decimal_places=2, help_text="Price per item at the time of order.")
+    product_title = models.CharField(max_length=255, blank=True, default='')
+    product_condition = models.CharField(max_length=20, choices=CONDITION_CHOICES, blank=True, default='')
+    product_image_url = models.URLField(max_length=1000, blank=True, default='')
+    seller_name = models.CharField(max_length=150, blank=True, default='')
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_title or 'Unknown Product'}"
+
+    @classmethod
+    def snapshot(cls, order, product, **fields):
+        """
+        Build an unsaved item for ``product`` capturing its current details.
+        Expects ``product.seller`` to be loaded and ``product.images``
+        prefetched to avoid per-item queries.
+        """
+        images = list(product.images.all())
+        return cls(
+            order=order,
+            product=product,
+            price=product.price,
+            product_title=product.title,
+            product_condition=product.condition,
+            product_image_url=images[0].image_url if images else '',
+            seller_name=product.seller.username,
+            **fields
+        )
+
+
+# ---------------------------------------------------
+# OutboxEvent Model
+# ---------------------------------------------------
+class OutboxEvent(UUIDTimeStampedModel):
+    """
+    A side effect recorded inside the transaction that caused it and delivered
+    after commit by the outbox dispatcher (see core/outbox.py).
+    """
+    event_type = models.CharField(max_length=30, choices=OUTBOX_EVENT_CHOICES)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=OUTBOX_STATUS_CHOICES, default='Pending')
+    attempts = models.PositiveIntegerField(default=0, help_text="Number of delivery attempts made so far.")
+    available_at = models.DateTimeField(default=timezone.now, help_text="Earliest time the next delivery attempt may run.")
+    processed_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.event_type} ({self.status})"
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='outbox_status_available_idx'),
+        ]
+
+
+# ---------------------------------------------------
+# DailyMetric Model
+# ---------------------------------------------------
+class DailyMetric(UUIDTimeStampedModel):
+    """
+    Pre-aggregated marketplace activity for one day, maintained by the
+    rollup_daily_metrics command. Rows with a category hold that category's
+    sales and listings; the row without a category holds marketplace-wide
+    totals, including orders and new users, which have no category.
+    """
+    day = models.DateField()
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name='daily_metrics', blank=True, null=True
+    )
+    orders = models.PositiveIntegerField(default=0)
+    items_sold = models.PositiveIntegerField(default=0)
+    gmv = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'),
+                              help_text="Gross merchandise value of successful transactions.")
+    new_listings = models.PositiveIntegerField(default=0)
+    new_users = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.day} {self.category.name if self.category else 'All categories'}"
+
+    class Meta:
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'category'], condition=models.Q(category__isnull=False),
+                                    name='unique_daily_metric_category'),
+            models.UniqueConstraint(fields=['day'], condition=models.Q(category__isnull=True),
+                                    name='unique_daily_metric_total'),
+        ]
+
+
+# ---------------------------------------------------
+# RollupCheckpoint Model
+# ---------------------------------------------------
+class RollupCheckpoint(models.Model):
+    """
+    High-water mark of source rows already folded into a rollup, so each run
+    only revisits days that received new data.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    processed_until = models.DateTimeField()
 
     def __str__(self):
-        product_title = self.product.title if self.product else 'Unknown Product'
-        return f"{self.quantity} x {product_title}"
+        return f"{self.name} @ {self.processed_until}"
@@ -0,0 +1,90 @@
+"""
+Transactional outbox for side effects triggered by checkout.
+
+Events are staged with ``event()`` and written with ``enqueue()`` inside the
+same database transaction as the state change that produced them. The
+``dispatch_outbox`` management command then delivers them in batches after
+commit. Delivery is at-least-once, so handlers must be idempotent.
+
+Handlers are configured per event type through the ``OUTBOX_HANDLERS``
+setting as dotted paths to callables accepting an ``OutboxEvent``.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+
+def event(event_type, **payload):
+    """Build an unsaved outbox event; values must be JSON serialisable."""
+    return OutboxEvent(event_type=event_type, payload=payload)
+
+
+def enqueue(events):
+    """Persist staged events in a single INSERT. Call inside the producing transaction."""
+    return OutboxEvent.objects.bulk_create(events)
+
+
+def log_event(outbox_event):
+    """Default handler: record the event in the application log."""
+    logger.info("Outbox event %s %s: %s", outbox_event.event_type, outbox_event.id, outbox_event.payload)
+
+
+def get_handlers(event_type):
+    return [import_string(path) for path in settings.OUTBOX_HANDLERS.get(event_type, [])]
+
+
+def _retry_delay(attempts):
+    # Exponential backoff capped at one hour.
+    return timedelta(seconds=min(2 ** attempts, 3600))
+
+
+def dispatch_pending(batch_size=None):
+    """
+    Deliver one batch of due events and return the number of events handled.
+
+    Rows are locked with SKIP LOCKED where the database supports it so that
+    several dispatchers can run side by side without delivering the same
+    batch twice.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    max_attempts = settings.OUTBOX_MAX_ATTEMPTS
+    now = timezone.now()
+
+    with transaction.atomic():
+        queryset = OutboxEvent.objects.filter(status='Pending', available_at__lte=now).order_by('available_at')
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        events = list(queryset[:batch_size])
+
+        for outbox_event in events:
+            outbox_event.attempts += 1
+            outbox_event.updated_at = now
+            try:
+                # A savepoint keeps a failing handler's writes from poisoning the batch.
+                with transaction.atomic():
+                    for handler in get_handlers(outbox_event.event_type):
+                        handler(outbox_event)
+            except Exception as e:
+                logger.exception("Outbox event %s failed on attempt %s", outbox_event.id, outbox_event.attempts)
+                outbox_event.last_error = str(e)
+                if outbox_event.attempts >= max_attempts:
+                    outbox_event.status = 'Failed'
+                else:
+                    outbox_event.available_at = now + _retry_delay(outbox_event.attempts)
+            else:
+                outbox_event.status = 'Processed'
+                outbox_event.processed_at = timezone.now()
+                outbox_event.last_error = None
+
+        OutboxEvent.objects.bulk_update(
+            events, ['status', 'attempts', 'available_at', 'processed_at', 'last_error', 'updated_at']
+        )
+    return len(events)
@@ -0,0 +1,234 @@
+"""
+Keyset (cursor) pagination.
+
+Unlike offset pagination, every page is a bounded index range scan starting
+from the last row of the previous page, so deep pages cost the same as the
+first one. Cursors are opaque, URL-safe tokens encoding the ordering values
+of a row.
+"""
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+
+
+def encode_cursor(values):
+    data = json.dumps([str(value) for value in values]).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def decode_cursor(token, model, fields):
+    """Turn a cursor back into typed values for ``fields`` of ``model``."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if len(raw) != len(fields):
+            raise ValueError
+        return [model._meta.get_field(field).to_python(value) for field, value in zip(fields, raw)]
+    except Exception:
+        raise NotFound("Invalid cursor.")
+
+
+def keyset_filter(fields, values, descending):
+    """
+    Build ``(f1, f2, ...) < (v1, v2, ...)`` (or ``>``) as portable OR-ed
+    conditions that databases can still answer from a composite index.
+    """
+    lookup = 'lt' if descending else 'gt'
+    conditions = []
+    for i, field in enumerate(fields):
+        equal = {f: v for f, v in zip(fields[:i], values[:i])}
+        conditions.append(Q(**equal, **{f"{field}__{lookup}": values[i]}))
+    return reduce(or_, conditions)
+
+
+def row_position(obj, fields):
+    return [getattr(obj, field) for field in fields]
+
+
+class KeysetPagination(BasePagination):
+    """
+    Newest-first cursor pagination with optional incremental sync.
+
+    - ``?cursor=<next>`` pages backwards through older rows.
+    - ``?since=<latest>`` returns only rows newer than a previously seen row,
+      oldest first; when more remain, ``next`` is the token to pass as ``since``.
+
+    ``ordering`` lists the key fields, most significant first; all of them
+    are sorted descending and the last one must be unique.
+    """
+    ordering = ('created_at', 'id')
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    since_query_param = 'since'
+
+    def get_page_size(self, request):
+        params = getattr(request, 'query_params', request.GET)
+        try:
+            size = int(params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def read_position(self, model, request):
+        """Parse the request into ``(page_size, since, cursor, position)``."""
+        params = getattr(request, 'query_params', request.GET)
+        since = params.get(self.since_query_param)
+        cursor = params.get(self.cursor_query_param)
+        self.syncing = since is not None
+        token = since if self.syncing else cursor
+        position = decode_cursor(token, model, list(self.ordering)) if token else None
+        return self.get_page_size(request), since, cursor, position
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size, since, cursor, position = self.read_position(queryset.model, request)
+        rows = self.fetch_rows(queryset, position, not self.syncing, page_size + 1)
+        if not self.syncing and len(rows) <= page_size:
+            rows = self.extend_history(rows, page_size + 1, position)
+        return self.build_page(rows, page_size, since, cursor)
+
+    async def apaginate_queryset(self, queryset, request):
+        """
+        Async variant for native async views, fetching with the async ORM.
+        ``extend_history`` is not consulted.
+        """
+        page_size, since, cursor, position = self.read_position(queryset.model, request)
+        seek = self.seek(queryset, position, not self.syncing)
+        rows = [row async for row in seek[:page_size + 1]]
+        return self.build_page(rows, page_size, since, cursor)
+
+    def build_page(self, rows, page_size, since, cursor):
+        fields = list(self.ordering)
+        has_more = len(rows) > page_size
+        page = rows[:page_size]
+
+        self.next = encode_cursor(row_position(page[-1], fields)) if has_more else None
+        if self.syncing:
+            self.latest = encode_cursor(row_position(page[-1], fields)) if page else since
+        elif page and not cursor:
+            self.latest = encode_cursor(row_position(page[0], fields))
+        else:
+            self.latest = None
+        return page
+
+    def seek(self, queryset, position, descending):
+        """``queryset`` in key order, starting strictly past ``position``."""
+        fields = list(self.ordering)
+        queryset = queryset.order_by(*[f"-{field}" if descending else field for field in fields])
+        if position:
+            queryset = queryset.filter(keyset_filter(fields, position, descending))
+        return queryset
+
+    def fetch_rows(self, queryset, position, descending, limit):
+        """Up to ``limit`` rows of ``queryset`` strictly past ``position`` in key order."""
+        return list(self.seek(queryset, position, descending)[:limit])
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.next,
+            'latest': self.latest,
+            'results': data,
+        }
+
+    def extend_history(self, rows, limit, position):
+        """
+        Hook called when history runs out before a page is full; may append
+        older rows from another source. ``position`` is the request cursor.
+        """
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'latest': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+class MessageCursorPagination(KeysetPagination):
+    """
+    Message history that reads through to ``archive_queryset`` (older,
+    archived messages of the same conversation) once hot rows run out.
+    """
+    ordering = ('created_at', 'id')
+    page_size = 50
+
+    def __init__(self, archive_queryset=None):
+        self.archive_queryset = archive_queryset
+
+    def extend_history(self, rows, limit, position):
+        if self.archive_queryset is None:
+            return rows
+        fields = list(self.ordering)
+        if rows:
+            position = row_position(rows[-1], fields)
+        archived = self.archive_queryset.order_by(*[f"-{field}" for field in fields])
+        if position:
+            archived = archived.filter(keyset_filter(fields, position, descending=True))
+        return rows + list(archived[:limit - len(rows)])
+
+
+class InboxCursorPagination(KeysetPagination):
+    ordering = ('last_activity_at', 'id')
+    page_size = 20
+
+
+class MergedKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination over the union of several querysets ("branches") of the
+    same model.
+
+    Each branch is seeked and limited on its own, so each can use its own
+    composite index, instead of one OR-ed filter that planners often turn
+    into a full scan. The per-branch pages are merged and de-duplicated in
+    Python; a page costs at most ``len(branches) * (page_size + 1)`` rows.
+    Pass a list of querysets to ``paginate_queryset``.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.branches = list(queryset)
+        # The base class only reads the model from the queryset it is given.
+        return super().paginate_queryset(self.branches[0], request, view)
+
+    def fetch_rows(self, queryset, position, descending, limit):
+        fields = list(self.ordering)
+        merged = {}
+        for branch in self.branches:
+            for row in super().fetch_rows(branch, position, descending, limit):
+                merged[row.pk] = row
+        rows = sorted(merged.values(), key=lambda row: row_position(row, fields), reverse=descending)
+        return rows[:limit]
+
+
+class TransactionHistoryPagination(MergedKeysetPagination):
+    ordering = ('created_at', 'id')
+    page_size = 50
+
+
+class OrderHistoryPagination(KeysetPagination):
+    ordering = ('created_at', 'id')
+    page_size = 20
+
+
+class ReportPagination(KeysetPagination):
+    ordering = ('created_at', 'id')
+    page_size = 50
+
+
+class ModerationQueuePagination(LimitOffsetPagination):
+    """Aggregated rows have no stable key to seek on, so the queue pages by offset."""
+    default_limit = 50
+    max_limit = 200
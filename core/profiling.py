@@ -0,0 +1,150 @@
+"""
+Per-request timing breakdown, reported in the ``Server-Timing`` header.
+
+``ServerTimingMiddleware`` starts a ``Timings`` collector for each sampled
+request and stores it in a context variable. Code anywhere in the request
+can then add to it with ``timing(name)``; when no collector is active (the
+request was not sampled, or the middleware is disabled) ``timing`` costs a
+single context variable lookup.
+
+Recorded phases:
+
+- ``db``: every query on every connection, with the query count.
+- ``auth``: JWT validation and token refresh.
+- ``view``: the view itself, including DRF serialization.
+- ``render``: rendering DRF/template responses.
+- ``total``: everything between this middleware's request and response hooks.
+"""
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('server_timings', default=None)
+
+
+class Timings:
+    def __init__(self):
+        self.durations = {}
+        self.counts = {}
+        self.started = time.perf_counter()
+
+    def add(self, name, seconds, count=1):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + count
+
+    def as_header(self):
+        metrics = []
+        for name, seconds in self.durations.items():
+            metric = f"{name};dur={seconds * 1000:.1f}"
+            if name == 'db':
+                metric += f';desc="{self.counts[name]} queries"'
+            metrics.append(metric)
+        return ', '.join(metrics)
+
+    def as_dict(self):
+        data = {f"{name}_ms": round(seconds * 1000, 2) for name, seconds in self.durations.items()}
+        data['db_queries'] = self.counts.get('db', 0)
+        return data
+
+
+def current_timings():
+    return _current.get()
+
+
+@contextmanager
+def timing(name):
+    """Add the duration of the block to ``name`` on the active collector, if any."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+def _time_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add('db', time.perf_counter() - start)
+
+
+def _install_query_timer(sender, connection, **kwargs):
+    # Persistent connections reconnect on the same wrapper object.
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+class ServerTimingMiddleware(MiddlewareMixin):
+    """
+    Emit a Server-Timing header and a structured log line for a sample of
+    requests, as configured by the SERVER_TIMING setting. When disabled the
+    middleware removes itself from the stack at startup.
+    """
+
+    def __init__(self, get_response):
+        config = settings.SERVER_TIMING
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.sample_rate = config['SAMPLE_RATE']
+        self.log = config['LOG']
+        connection_created.connect(_install_query_timer, dispatch_uid='core.profiling.query_timer')
+        for connection in connections.all(initialized_only=True):
+            _install_query_timer(None, connection)
+        super().__init__(get_response)
+
+    def process_request(self, request):
+        sampled = self.sample_rate >= 1 or random.random() < self.sample_rate
+        _current.set(Timings() if sampled else None)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        timings = _current.get()
+        if timings is not None and hasattr(request, '_view_started'):
+            timings.add('view', time.perf_counter() - request._view_started)
+            del request._view_started
+            render_started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: timings.add('render', time.perf_counter() - render_started)
+            )
+        return response
+
+    def process_response(self, request, response):
+        timings = _current.get()
+        if timings is None:
+            return response
+        _current.set(None)
+        if hasattr(request, '_view_started'):
+            timings.add('view', time.perf_counter() - request._view_started)
+        timings.add('total', time.perf_counter() - timings.started)
+        response['Server-Timing'] = timings.as_header()
+        if self.log:
+            match = getattr(request, 'resolver_match', None)
+            logger.info("server-timing %s", json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'route': match.view_name if match else None,
+                'status': response.status_code,
+                **timings.as_dict(),
+            }))
+        return response
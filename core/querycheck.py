@@ -0,0 +1,166 @@
+"""
+N+1 and slow-query detection for development and tests.
+
+``QueryCheckMiddleware`` (or the ``check_queries()`` context manager in
+tests) groups the queries of a request by normalized SQL. A statement that
+runs ``N_PLUS_ONE_THRESHOLD`` or more times is reported as a likely N+1,
+together with the first frame in ``APP_FRAMES`` that issued it, typically a
+view or a nested serializer. Queries slower than ``SLOW_QUERY_MS`` are
+logged as they happen. With ``RAISE`` set, findings raise
+``QueryCheckError`` so a test run fails instead of logging.
+
+Configured by the QUERY_CHECK setting; it is on by default under DEBUG and
+test runs, and the middleware removes itself otherwise.
+"""
+import logging
+import re
+import sysconfig
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('query_check', default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN \((?:(?:%s|\?), )*(?:%s|\?)\)", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+_STDLIB = sysconfig.get_paths()['stdlib']
+
+
+class QueryCheckError(Exception):
+    pass
+
+
+def normalize_sql(sql):
+    """Reduce SQL to its shape: literals and IN lists collapsed, whitespace squeezed."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def _is_library(filename):
+    return 'site-packages' in filename or filename.startswith(_STDLIB) or filename == __file__
+
+
+def app_frame():
+    """
+    ``path:line in function`` of the innermost frame in one of APP_FRAMES,
+    else of the innermost frame outside libraries (e.g. a test or command).
+    """
+    suffixes = tuple(settings.QUERY_CHECK['APP_FRAMES'])
+    fallback = None
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.replace('\\', '/').endswith(suffixes):
+            return f"{frame.filename}:{frame.lineno} in {frame.name}"
+        if fallback is None and not _is_library(frame.filename):
+            fallback = f"{frame.filename}:{frame.lineno} in {frame.name}"
+    return fallback
+
+
+class QueryLog:
+    def __init__(self, label):
+        self.label = label
+        self.counts = Counter()
+        self.origins = {}
+        self.slow = []
+
+    def record(self, sql, seconds):
+        shape = normalize_sql(sql)
+        self.counts[shape] += 1
+        if shape not in self.origins:
+            self.origins[shape] = app_frame()
+        slow_ms = settings.QUERY_CHECK['SLOW_QUERY_MS']
+        if slow_ms is not None and seconds * 1000 >= slow_ms:
+            origin = app_frame()
+            self.slow.append((seconds, sql, origin))
+            logger.warning("Slow query (%.1f ms) in %s at %s: %s", seconds * 1000, self.label, origin, sql)
+
+    def repeated(self):
+        threshold = settings.QUERY_CHECK['N_PLUS_ONE_THRESHOLD']
+        return [(shape, count) for shape, count in self.counts.most_common() if count >= threshold]
+
+    def report(self):
+        """Log findings; raise QueryCheckError if configured to."""
+        problems = []
+        for shape, count in self.repeated():
+            message = f"Possible N+1 in {self.label}: {count} x {shape} (from {self.origins[shape]})"
+            logger.warning(message)
+            problems.append(message)
+        problems.extend(
+            f"Slow query in {self.label} ({seconds * 1000:.1f} ms, from {origin}): {sql}"
+            for seconds, sql, origin in self.slow
+        )
+        if problems and settings.QUERY_CHECK['RAISE']:
+            raise QueryCheckError('\n'.join(problems))
+
+
+def _check_query(execute, sql, params, many, context):
+    log = _current.get()
+    if log is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        log.record(sql, time.perf_counter() - start)
+
+
+def install_query_check():
+    def install(sender, connection, **kwargs):
+        if _check_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(_check_query)
+
+    connection_created.connect(install, weak=False, dispatch_uid='core.querycheck.install')
+    for connection in connections.all(initialized_only=True):
+        install(None, connection)
+
+
+@contextmanager
+def check_queries(label='block'):
+    """
+    Record the queries run inside the block and report them on exit::
+
+        with check_queries('order list'):
+            client.get('/api/orders/')
+    """
+    install_query_check()
+    log = QueryLog(label)
+    token = _current.set(log)
+    try:
+        yield log
+    finally:
+        _current.reset(token)
+    log.report()
+
+
+class QueryCheckMiddleware(MiddlewareMixin):
+    def __init__(self, get_response):
+        if not settings.QUERY_CHECK['ENABLED']:
+            raise MiddlewareNotUsed
+        install_query_check()
+        super().__init__(get_response)
+
+    def process_request(self, request):
+        # Inside check_queries() the enclosing block collects and reports.
+        if _current.get() is None:
+            request._query_log = QueryLog(f"{request.method} {request.path}")
+            _current.set(request._query_log)
+
+    def process_response(self, request, response):
+        log = getattr(request, '_query_log', None)
+        if log is not None:
+            _current.set(None)
+            log.report()
+        return response
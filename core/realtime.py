@@ -0,0 +1,160 @@
+"""
+Pub/sub used to push chat events to connected clients.
+
+Every user has a channel (``user:<id>``); chat views publish events for each
+participant of a conversation and the streaming endpoints in
+core/async_views.py subscribe to the requesting user's channel.
+
+The backend is selected with the ``CHAT_BROKER`` setting. ``InProcessBroker``
+fans out within a single process, which is enough for one ASGI worker;
+``RedisBroker`` relays through Redis pub/sub for multi-process deployments.
+"""
+import asyncio
+import json
+import threading
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+class BaseBroker:
+    """
+    Broker interface. ``publish`` may be called from any thread (sync views run
+    in worker threads); ``subscribe`` is an async context manager yielding an
+    object whose ``get()`` coroutine returns the next message.
+    """
+
+    def __init__(self, **options):
+        self.options = options
+
+    def publish(self, channel, message):
+        raise NotImplementedError
+
+    def subscribe(self, channel):
+        raise NotImplementedError
+
+
+class _QueueSubscription:
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def deliver(self, message):
+        # Runs on the subscriber's loop; slow consumers lose messages rather than memory.
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            pass
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class InProcessBroker(BaseBroker):
+    """Fan-out to subscribers living in this process only."""
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.queue_size = options.get('QUEUE_SIZE', 100)
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:
+                # The subscriber's loop has already been closed.
+                pass
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        subscription = _QueueSubscription(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(channel)
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+
+class _RedisSubscription:
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    async def get(self):
+        while True:
+            message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+            if message is not None:
+                return json.loads(message['data'])
+
+
+class RedisBroker(BaseBroker):
+    """Fan-out across processes through Redis pub/sub. Requires the ``redis`` package."""
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        import redis
+        self.url = options['URL']
+        self._client = redis.Redis.from_url(self.url)
+
+    def publish(self, channel, message):
+        self._client.publish(channel, json.dumps(message, cls=DjangoJSONEncoder))
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        import redis.asyncio
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            yield _RedisSubscription(pubsub)
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.close()
+            await client.close()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = settings.CHAT_BROKER
+                _broker = import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+    return _broker
+
+
+def publish_to_users(user_ids, event_type, data):
+    """
+    Publish an event to each user's channel once the current transaction commits,
+    so clients are never told about rows they cannot read yet.
+    """
+    # Round-trip through JSON so in-process subscribers receive the same plain
+    # data a Redis subscriber would.
+    message = json.loads(json.dumps({'type': event_type, 'data': data}, cls=DjangoJSONEncoder))
+    channels = [user_channel(user_id) for user_id in user_ids]
+
+    def send():
+        broker = get_broker()
+        for channel in channels:
+            broker.publish(channel, message)
+
+    transaction.on_commit(send)
@@ -0,0 +1,80 @@
+"""
+Fast JSON (orjson) and MessagePack renderers and parsers for DRF.
+
+The JSON pair is a drop-in replacement for DRF's JSONRenderer/JSONParser:
+same media type and compact UTF-8 output, with types orjson does not
+handle natively (Decimal, lazy strings, querysets, and datetimes, which
+DRF trims to milliseconds) passed to DRF's own encoder, and U+2028/U+2029
+escaped as DRF does. One difference remains: orjson writes NaN and
+Infinity floats as null where DRF raises (STRICT_JSON). Detecting them
+would mean walking every payload in Python, which costs as much as DRF's
+encoder; models here have no float fields, so money and counts never
+produce them.
+
+MessagePack is offered to clients that send ``Accept: application/msgpack``
+and accepted as a request body with that content type. The ``msgpack``
+package is imported on first use.
+"""
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_encoder = JSONEncoder()
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def _default(obj):
+    return _encoder.default(obj)
+
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rendered = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        # JavaScript line terminators, escaped as in DRF's JSONRenderer.
+        return rendered.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class ORJSONParser(BaseParser):
+    media_type = 'application/json'
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        import msgpack
+
+        if data is None:
+            return b''
+        # MessagePack has no Decimal/UUID/datetime types either; use the JSON forms.
+        return msgpack.packb(data, default=_default, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        import msgpack
+
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, TypeError) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
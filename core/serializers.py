@@ -159,8 +159,35 @@ class ConversationSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Conversation
-        fields = ['id', 'product', 'participants', 'created_at', 'updated_at', 'messages']
-        read_only_fields = ['id', 'created_at', 'updated_at', 'participants', 'messages']
+        fields = ['id', 'product', 'buyer', 'seller', 'participants', 'created_at', 'updated_at', 'messages']
+        read_only_fields = ['id', 'buyer', 'seller', 'created_at', 'updated_at', 'participants', 'messages']
+        # The (product, buyer, seller) constraint is applied by the view's
+        # get_or_create; DRF's generated validator would make product required.
+        extra_kwargs = {'product': {'required': False}}
+        validators = []
+
+
+# ---------------------------------------------------
+# Inbox Serializer
+# ---------------------------------------------------
+class InboxConversationSerializer(serializers.ModelSerializer):
+    """
+    Read-only inbox row. Expects the annotations added by
+    ConversationViewSet.inbox so that a page renders from a single query.
+    """
+    product_title = serializers.CharField(read_only=True)
+    counterpart_username = serializers.CharField(read_only=True)
+    last_message_sender_username = serializers.CharField(read_only=True)
+    unread_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Conversation
+        fields = [
+            'id', 'product', 'product_title', 'counterpart_username',
+            'last_message_preview', 'last_message_sender_username',
+            'last_activity_at', 'unread_count'
+        ]
+        read_only_fields = fields
 
 
 # ---------------------------------------------------
@@ -185,8 +212,10 @@ class CartItemSerializer(serializers.ModelSerializer):
     # For output: nested full product representation.
     product = ProductSerializer(read_only=True)
     # For input: accept product's UUID as primary key.
+    # Related rows are joined here so the response needs no extra lookups.
     product_id = serializers.PrimaryKeyRelatedField(
-        queryset=Product.objects.all(), write_only=True, source='product'
+        queryset=Product.objects.select_related('category', 'seller', 'bought_by'),
+        write_only=True, source='product'
     )
 
     class Meta:
@@ -221,11 +250,49 @@ class CartSerializer(serializers.ModelSerializer):
 # OrderItem Serializer
 # ---------------------------------------------------
 class OrderItemSerializer(serializers.ModelSerializer):
-    product = ProductSerializer(read_only=True)  # Nested full product details
+    # Product details as captured at checkout, in the ProductSerializer shape;
+    # unaffected by later edits or deletion of the listing. Details the
+    # snapshot does not keep are null.
+    product = serializers.SerializerMethodField()
+    product_snapshot = serializers.SerializerMethodField()
 
     class Meta:
         model = OrderItem
-        fields = ['id', 'product', 'quantity', 'price']
+        fields = ['id', 'product', 'product_snapshot', 'quantity', 'price']
+
+    def get_product(self, obj):
+        price = serializers.DecimalField(max_digits=10, decimal_places=2).to_representation(obj.price)
+        images = []
+        if obj.product_image_url:
+            images.append({
+                'id': None, 'product': obj.product_id, 'image_url': obj.product_image_url,
+                'caption': None, 'order': 0, 'created_at': None,
+            })
+        return {
+            'id': obj.product_id,
+            'seller': obj.seller_name or None,
+            'title': obj.product_title,
+            'description': None,
+            'price': price,
+            'condition': obj.product_condition,
+            'location': None,
+            'category_name': None,
+            'is_active': None,
+            'is_sold': None,
+            'bought_by': None,
+            'created_at': None,
+            'updated_at': None,
+            'images': images,
+        }
+
+    def get_product_snapshot(self, obj):
+        return {
+            'id': obj.product_id,
+            'title': obj.product_title,
+            'condition': obj.product_condition,
+            'image_url': obj.product_image_url or None,
+            'seller_name': obj.seller_name,
+        }
 
 
 # ---------------------------------------------------
@@ -0,0 +1,47 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from .carts import (
+    invalidate_cart_summaries_for_carts, invalidate_cart_summaries_for_products, invalidate_cart_summaries_for_sellers
+)
+from .models import CartItem, Product, User
+
+# Cached cart summaries are dropped on commit whenever something they show
+# changes outside the cart views (which invalidate explicitly). Queryset
+# update() bypasses these receivers; callers using it invalidate themselves.
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, created, **kwargs):
+    # Price, availability or ownership changes affect every cart holding the product.
+    if not created:
+        invalidate_cart_summaries_for_products([instance.pk])
+
+
+@receiver(pre_delete, sender=Product)
+def product_deleting(sender, instance, **kwargs):
+    # Look the carts up before the cascade removes their items.
+    invalidate_cart_summaries_for_products([instance.pk])
+
+
+@receiver(post_delete, sender=CartItem)
+def cart_item_deleted(sender, instance, origin=None, **kwargs):
+    # Product deletions were handled in product_deleting.
+    if isinstance(origin, Product) or getattr(origin, 'model', None) is Product:
+        return
+    invalidate_cart_summaries_for_carts([instance.cart_id])
+
+
+@receiver(post_init, sender=User)
+def user_loaded(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred is_active is not loaded here.
+    instance._loaded_is_active = instance.__dict__.get('is_active')
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    # Deactivating or reactivating a seller changes the availability of their listings.
+    is_active = instance.__dict__.get('is_active')
+    if not created and None not in (is_active, instance._loaded_is_active) and is_active != instance._loaded_is_active:
+        invalidate_cart_summaries_for_sellers([instance.pk])
+    instance._loaded_is_active = is_active
@@ -1,3 +1,98 @@
-from django.test import TestCase
+from django.conf import settings
+from django.db import connections
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
 
-# Create your tests here.
+from .models import Category, Product, ProductImage, User
+from .querycheck import QueryCheckError, check_queries
+
+
+# ---------------------------------------------------
+# Read-replica routing
+# ---------------------------------------------------
+REPLICA = 'replica_test'
+# A second alias onto the test database stands in for a replica. It has to
+# exist before the runner sets up test databases, which then mirrors it.
+connections.settings.setdefault(REPLICA, {
+    **connections.settings['default'],
+    'TEST': {**connections.settings['default']['TEST'], 'MIRROR': 'default'},
+})
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRoutingTests(TransactionTestCase):
+    """Each request's captured queries show which alias the router picked."""
+    databases = {'default', REPLICA}
+
+    def setUp(self):
+        self.user = User.objects.create_user('reader', 'reader@example.com', 'pw12345678')
+        Category.objects.create(name='Books')
+        self.client = Client()
+        self.client.cookies['access_token'] = str(RefreshToken.for_user(self.user).access_token)
+
+    def get_categories(self):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections[REPLICA]) as replica:
+            response = self.client.get('/api/categories/')
+        self.assertEqual(response.status_code, 200)
+        return len(primary.captured_queries), len(replica.captured_queries)
+
+    def test_reads_use_the_replica(self):
+        primary, replica = self.get_categories()
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_read_after_write_within_the_pin_window_uses_the_primary(self):
+        response = self.client.patch(
+            '/api/auth/profile', {'contact_details': 'Lisbon'}, content_type='application/json'
+        )
+        self.assertLess(response.status_code, 400)
+        pin = response.cookies[settings.DATABASE_ROUTING['PIN_COOKIE']]
+        self.assertEqual(pin['max-age'], settings.DATABASE_ROUTING['PIN_SECONDS'])
+        self.assertFalse(pin['secure'])
+        self.assertEqual(pin['samesite'], 'Lax')
+
+        primary, replica = self.get_categories()
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_pin_cookie_is_secure_over_https(self):
+        response = self.client.patch(
+            '/api/auth/profile', {'contact_details': 'Lisbon'}, content_type='application/json', secure=True
+        )
+        pin = response.cookies[settings.DATABASE_ROUTING['PIN_COOKIE']]
+        self.assertTrue(pin['secure'])
+        self.assertEqual(pin['samesite'], 'None')
+
+
+# ---------------------------------------------------
+# N+1 detection
+# ---------------------------------------------------
+@override_settings(QUERY_CHECK={
+    **settings.QUERY_CHECK, 'N_PLUS_ONE_THRESHOLD': 5, 'SLOW_QUERY_MS': None, 'RAISE': True,
+})
+class QueryCheckTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('buyer', 'buyer@example.com', 'pw12345678')
+        category = Category.objects.create(name='Furniture')
+        for i in range(8):
+            seller = User.objects.create_user(f'seller{i}', f'seller{i}@example.com', 'pw12345678')
+            product = Product.objects.create(
+                seller=seller, category=category, title=f'Chair {i}', description='Oak.', price=10 + i,
+                condition='Used',
+            )
+            ProductImage.objects.create(product=product, image_url=f'https://img.example.com/{i}.png')
+
+    def test_product_list_passes(self):
+        self.client.cookies['access_token'] = str(RefreshToken.for_user(self.user).access_token)
+        with check_queries('product list'):
+            response = self.client.get('/api/products/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 8)
+
+    def test_n_plus_one_fails(self):
+        with self.assertRaisesMessage(QueryCheckError, 'Possible N+1 in seller names: 8 x'):
+            with check_queries('seller names'):
+                [product.seller.username for product in Product.objects.all()]
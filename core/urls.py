@@ -7,8 +7,10 @@ from .views import (
     ProductViewSet, ProductImageViewSet, CategoryViewSet, TransactionViewSet,
     ReportViewSet, MessageViewSet, AdminUserViewSet, AdminProductViewSet,
     ConversationViewSet,  # Correct viewset registration for conversations
-    AdminReportViewSet, CartItemViewSet, CheckoutView, OrderViewSet,EmptyCartView,CustomTokenRefreshView,CheckIsAuthenticated
+    AdminReportViewSet, CartItemViewSet, CheckoutView, OrderViewSet,EmptyCartView,CustomTokenRefreshView,CheckIsAuthenticated,
+    AdminStatsView, AdminExportView
 )
+from .async_views import chat_stream, chat_poll, product_list, product_detail, category_list, inbox
 
 router = DefaultRouter()
 router.register(r'products', ProductViewSet, basename='product')
@@ -38,6 +40,20 @@ urlpatterns = [
     path('auth/checkout', CheckoutView.as_view(), name='checkout'),
     path('auth/cart/empty', EmptyCartView.as_view(), name='empty_cart'),
     path('auth/token/refresh', CustomTokenRefreshView.as_view(), name='token_refresh'),
+
+    # Admin dashboard
+    path('admin/stats', AdminStatsView.as_view(), name='admin_stats'),
+    path('admin/exports/<str:dataset>', AdminExportView.as_view(), name='admin_export'),
+
+    # Real-time chat (served natively under ASGI)
+    path('chat/stream', chat_stream, name='chat_stream'),
+    path('chat/poll', chat_poll, name='chat_poll'),
+
+    # Async read endpoints (native async twins of hot DRF reads)
+    path('async/products', product_list, name='async_product_list'),
+    path('async/products/<uuid:pk>', product_detail, name='async_product_detail'),
+    path('async/categories', category_list, name='async_category_list'),
+    path('async/conversations/inbox', inbox, name='async_inbox'),
     
     # All other endpoints via the router
     path('', include(router.urls)),
@@ -1,31 +1,78 @@
 from django.contrib.auth import authenticate
-from django.db.models import Q, F
+from django.db.models import Q, F, Count, Min, Sum, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import timedelta
 from django.shortcuts import get_object_or_404
-from django.db import transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.db import transaction, IntegrityError
 from rest_framework import viewsets, generics, status, filters
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.decorators import action
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
 from .models import (
     User, Category, Product, ProductImage,
-    Transaction, Report, Conversation, Message,
-    Cart, CartItem, Order, OrderItem
+    Transaction, Report, Conversation, ConversationReadMarker, Message,
+    CartItem, Order, OrderItem, DailyMetric
 )
 from .serializers import (
     UserSerializer, CategorySerializer, ProductSerializer,
     ProductImageSerializer, TransactionSerializer, ReportSerializer,
-    ConversationSerializer, MessageSerializer,
-    CartItemSerializer, CartSerializer, OrderSerializer
+    ConversationSerializer, MessageSerializer, InboxConversationSerializer,
+    CartItemSerializer, OrderSerializer
+)
+from . import outbox
+from .realtime import publish_to_users
+from .pagination import (
+    MessageCursorPagination, InboxCursorPagination, ModerationQueuePagination, ReportPagination,
+    TransactionHistoryPagination, OrderHistoryPagination, decode_cursor, keyset_filter
+)
+from .metrics import CHECKOUTS
+from .exports import EXPORT_FORMATS, EXPORTS, aexport_lines, export_filename, export_lines
+from .carts import (
+    get_request_cart, get_cart_summary, invalidate_cart_summary, invalidate_cart_summaries_for_products,
+    invalidate_cart_summaries_for_sellers
 )
 import base64
 import uuid
-from django.core.files.base import ContentFile
 from django.conf import settings
 import os
 
+
+def parse_uuid_list(data, key, required=True):
+    """Read a list of UUIDs from request data, raising a 400 on malformed input."""
+    values = data.get(key)
+    if values is None and not required:
+        return set()
+    if not isinstance(values, list) or (required and not values):
+        raise ValidationError({key: "A non-empty list of IDs is required."})
+    try:
+        return {uuid.UUID(str(value)) for value in values}
+    except ValueError:
+        raise ValidationError({key: "IDs must be valid UUIDs."})
+
+
+def parse_query_date(params, name):
+    """Read an optional YYYY-MM-DD query parameter, raising a 400 on malformed or impossible dates."""
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        day = parse_date(value)
+    except ValueError:
+        # Well-formed but impossible, e.g. 2024-02-30.
+        day = None
+    if day is None:
+        raise ValidationError({name: "Must be a valid date in YYYY-MM-DD format."})
+    return day
+
+
 # ---------------------------------------------------
 # Authentication Related Views
 # ---------------------------------------------------
@@ -172,6 +219,39 @@ class ProfileView(generics.RetrieveUpdateAPIView):
 # ---------------------------------------------------
 # Product & Category Related Views
 # ---------------------------------------------------
+
+
+def browse_products(params, user):
+    """
+    Products visible in the marketplace to ``user``, filtered by the
+    title, category, min_price, max_price, location and condition params.
+    Shared by ProductViewSet and the async product views.
+    """
+    queryset = Product.objects.filter(
+        is_sold=False, is_active=True).select_related('category', 'seller')
+    title = params.get('title')
+    category = params.get('category')
+    min_price = params.get('min_price')
+    max_price = params.get('max_price')
+    location = params.get('location')
+    condition = params.get('condition')
+    if title:
+        queryset = queryset.filter(title__icontains=title)
+    if category:
+        queryset = queryset.filter(category__name__iexact=category)
+    if min_price:
+        queryset = queryset.filter(price__gte=min_price)
+    if max_price:
+        queryset = queryset.filter(price__lte=max_price)
+    if location:
+        queryset = queryset.filter(location__icontains=location)
+    if condition:
+        queryset = queryset.filter(condition__iexact=condition)
+    if user.role != 'Admin':
+        queryset = queryset.exclude(seller=user)
+    return queryset
+
+
 class ProductViewSet(viewsets.ModelViewSet):
     """
     CRUD operations for products.
@@ -192,29 +272,8 @@ class ProductViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        queryset = Product.objects.filter(
-            is_sold=False, is_active=True).select_related('category', 'seller')
-        title = self.request.query_params.get('title')
-        category = self.request.query_params.get('category')
-        min_price = self.request.query_params.get('min_price')
-        max_price = self.request.query_params.get('max_price')
-        location = self.request.query_params.get('location')
-        condition = self.request.query_params.get('condition')
-        if title:
-            queryset = queryset.filter(title__icontains=title)
-        if category:
-            queryset = queryset.filter(category__name__iexact=category)
-        if min_price:
-            queryset = queryset.filter(price__gte=min_price)
-        if max_price:
-            queryset = queryset.filter(price__lte=max_price)
-        if location:
-            queryset = queryset.filter(location__icontains=location)
-        if condition:
-            queryset = queryset.filter(condition__iexact=condition)
-        if self.request.user.role != 'Admin':
-            queryset = queryset.exclude(seller=self.request.user)
-        return queryset
+        return browse_products(self.request.query_params, self.request.user).select_related(
+            'bought_by').prefetch_related('images')
 
     def create(self, request, *args, **kwargs):
         # Extract base64 images from request data
@@ -330,11 +389,14 @@ class TransactionViewSet(viewsets.ModelViewSet):
     - Automatically records transaction details during checkout.
 
     Endpoints:
-    - GET: List user's transactions.
+    - GET: List user's transactions, newest first, cursor paginated
+      (?role=buyer|seller narrows to one side; see KeysetPagination).
     - POST: Create new transaction (usually via checkout).
     """
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = TransactionHistoryPagination
+    ROLES = ('buyer', 'seller')
 
     def get_queryset(self):
         user = self.request.user
@@ -342,6 +404,24 @@ class TransactionViewSet(viewsets.ModelViewSet):
             return Transaction.objects.all()
         return Transaction.objects.filter(Q(buyer=user) | Q(seller=user))
 
+    def get_history_branches(self):
+        """
+        One queryset per side of the history. Each is served by its own
+        (buyer|seller, created_at, id) index; the paginator merges them.
+        """
+        user = self.request.user
+        role = self.request.query_params.get('role')
+        if role is not None and role not in self.ROLES:
+            raise ValidationError({"role": "Must be 'buyer' or 'seller'."})
+        if user.role == 'Admin' and role is None:
+            return [Transaction.objects.all()]
+        return [Transaction.objects.filter(**{side: user}) for side in self.ROLES if role in (None, side)]
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginator.paginate_queryset(self.get_history_branches(), request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -396,9 +476,40 @@ class ReportViewSet(viewsets.ModelViewSet):
 # ---------------------------------------------------
 # Conversation & Message (Chat) Related ViewSets
 # ---------------------------------------------------
+
+
+def inbox_queryset(user):
+    """
+    The user's conversations annotated for InboxConversationSerializer, so a
+    page renders from a single query. Shared with the async inbox view.
+    """
+    counterpart = User.objects.filter(conversations=OuterRef('pk')).exclude(pk=user.pk)
+    unread = ConversationReadMarker.objects.filter(conversation=OuterRef('pk'), user=user)
+    return Conversation.objects.filter(participants=user).annotate(
+        product_title=F('product__title'),
+        last_message_sender_username=F('last_message_sender__username'),
+        counterpart_username=Subquery(counterpart.values('username')[:1]),
+        unread_count=Coalesce(Subquery(unread.values('unread_count')[:1]), Value(0)),
+    )
+
+
 class ConversationViewSet(viewsets.ModelViewSet):
     """
     Manage conversations (chat between users).
+
+    Creating a conversation about a ``product`` opens (or reuses) the thread
+    with its seller; a conversation without one needs the other user's id
+    as ``participant``.
+
+    Endpoints:
+    - GET inbox/: Cursor-paginated conversations by latest activity with
+      last message preview, counterpart, product title and unread count.
+    - GET {id}/messages/: Cursor-paginated messages, newest first.
+      Pass ``cursor`` to load older history (continuing into archived
+      messages) or ``since`` to fetch only messages newer than a previously
+      returned ``latest`` cursor.
+    - POST {id}/read/: Mark messages read up to an optional ``up_to`` cursor
+      (everything when omitted).
     """
     serializer_class = ConversationSerializer
     permission_classes = [IsAuthenticated]
@@ -410,19 +521,105 @@ class ConversationViewSet(viewsets.ModelViewSet):
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        conv = serializer.save()
-        conv.participants.add(self.request.user)
+        product = serializer.validated_data.get('product')
+        if product is None:
+            # Direct conversations name the other participant explicitly.
+            counterpart = self.get_counterpart(request)
+            with transaction.atomic():
+                conv = serializer.save()
+                conv.add_participants(request.user, counterpart)
+            created = True
+        elif product.seller_id == request.user.id:
+            return Response(
+                {"error": "Bad Request",
+                    "detail": "You cannot start a conversation about your own product."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        else:
+            # One conversation per (product, buyer, seller), enforced by a unique constraint.
+            with transaction.atomic():
+                conv, created = Conversation.objects.get_or_create(
+                    product=product, buyer=request.user, seller_id=product.seller_id
+                )
+                if created:
+                    conv.add_participants(request.user, product.seller)
+        serializer = self.get_serializer(conv)
         headers = self.get_success_headers(serializer.data)
         response_data = {
-            "detail": "Conversation created successfully.",
+            "detail": "Conversation created successfully." if created else "Conversation already exists.",
             "conversation": serializer.data
         }
-        return Response(response_data, status=status.HTTP_201_CREATED, headers=headers)
+        return Response(
+            response_data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK, headers=headers
+        )
+
+    def get_counterpart(self, request):
+        counterpart_id = request.data.get('participant')
+        if not counterpart_id:
+            raise ValidationError({"participant": "Required when the conversation is not about a product."})
+        try:
+            counterpart = User.objects.get(pk=uuid.UUID(str(counterpart_id)), is_active=True)
+        except (ValueError, User.DoesNotExist):
+            raise ValidationError({"participant": "Unknown user."})
+        if counterpart.pk == request.user.pk:
+            raise ValidationError({"participant": "You cannot start a conversation with yourself."})
+        return counterpart
+
+    @action(detail=False, methods=['get'])
+    def inbox(self, request):
+        paginator = InboxCursorPagination()
+        page = paginator.paginate_queryset(inbox_queryset(request.user), request, view=self)
+        serializer = InboxConversationSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    def messages(self, request, pk=None):
+        conversation = self.get_object()
+        paginator = MessageCursorPagination(archive_queryset=conversation.archived_messages.all())
+        page = paginator.paginate_queryset(conversation.messages.all(), request, view=self)
+        serializer = MessageSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['post'])
+    def read(self, request, pk=None):
+        conversation = self.get_object()
+        up_to = request.data.get('up_to')
+        unread = Message.objects.filter(conversation=conversation, read_status=False).exclude(sender=request.user)
+        if up_to:
+            fields = list(MessageCursorPagination.ordering)
+            try:
+                position = decode_cursor(up_to, Message, fields)
+            except NotFound:
+                raise ValidationError({"up_to": "Invalid cursor."})
+            # Up to and including the cursor's (created_at, id), as the history pages order them.
+            unread = unread.exclude(keyset_filter(fields, position, descending=False))
+            read_until = position[0]
+        else:
+            read_until = timezone.now()
+            unread = unread.filter(created_at__lte=read_until)
+
+        with transaction.atomic():
+            marked = unread.update(read_status=True)
+            ConversationReadMarker.objects.filter(conversation=conversation, user=request.user).update(
+                last_read_at=Greatest(Coalesce(F('last_read_at'), Value(read_until)), Value(read_until)),
+                unread_count=Greatest(F('unread_count') - marked, 0) if up_to else 0
+            )
+        if marked:
+            publish_to_users(
+                conversation.participants.exclude(pk=request.user.pk).values_list('id', flat=True),
+                'read',
+                {'conversation': conversation.id, 'reader': request.user.id, 'up_to': read_until}
+            )
+        return Response({"detail": "Messages marked as read.", "marked": marked}, status=status.HTTP_200_OK)
 
 
 class MessageViewSet(viewsets.ModelViewSet):
     """
     Manage messages within a conversation.
+
+    Updates may only change the content of your own messages. Read state is
+    changed through ``POST conversations/<id>/read/``, which also keeps the
+    inbox unread counts in step.
     """
     serializer_class = MessageSerializer
     permission_classes = [IsAuthenticated]
@@ -431,17 +628,41 @@ class MessageViewSet(viewsets.ModelViewSet):
         user = self.request.user
         return Message.objects.filter(conversation__participants=user)
 
+    def update(self, request, *args, **kwargs):
+        if 'read_status' in request.data:
+            raise ValidationError(
+                {"read_status": "Mark messages read with POST conversations/<id>/read/."}
+            )
+        message = self.get_object()
+        if message.sender_id != request.user.id:
+            raise PermissionDenied("You can only edit your own messages.")
+        if 'conversation' in request.data and str(request.data['conversation']) != str(message.conversation_id):
+            raise ValidationError({"conversation": "Messages cannot be moved to another conversation."})
+        return super().update(request, *args, **kwargs)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            if not instance.read_status:
+                ConversationReadMarker.forget_unread([(instance.conversation_id, instance.sender_id)])
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         conversation = serializer.validated_data.get('conversation')
-        if self.request.user not in conversation.participants.all():
-            conversation.participants.add(self.request.user)
-        message = serializer.save(sender=self.request.user)
+        if not conversation.has_participant(self.request.user):
+            raise PermissionDenied("You are not a participant in this conversation.")
+        with transaction.atomic():
+            message = serializer.save(sender=self.request.user)
+            conversation.record_message(message)
+        message_data = MessageSerializer(message).data
+        publish_to_users(
+            conversation.participants.values_list('id', flat=True), 'message', message_data
+        )
         headers = self.get_success_headers(serializer.data)
         response_data = {
             "detail": "Message sent successfully.",
-            "message": MessageSerializer(message).data
+            "message": message_data
         }
         return Response(response_data, status=status.HTTP_201_CREATED, headers=headers)
 
@@ -454,42 +675,94 @@ class CartItemViewSet(viewsets.ModelViewSet):
     Manage shopping cart items.
 
     Features:
-    - Automatically creates cart for new users.
-    - Prevents duplicate products in cart.
+    - Resolves the user's cart once per request.
+    - Prevents duplicate products in cart via a unique (cart, product) constraint.
     - Associates items with user's cart.
 
     Endpoints:
     - GET: List cart items.
     - POST: Add item to cart.
+    - POST batch/: Add many products to the cart in one insert.
+    - GET summary/: Item count, subtotal and availability warnings (cached).
     - DELETE: Remove item from cart.
     """
     serializer_class = CartItemSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        cart, _ = Cart.objects.get_or_create(user=self.request.user)
-        return cart.items.all()
+        return CartItem.objects.filter(cart__user=self.request.user).select_related(
+            'product__category', 'product__seller', 'product__bought_by'
+        ).prefetch_related('product__images')
 
     def create(self, request, *args, **kwargs):
-        cart, _ = Cart.objects.get_or_create(user=self.request.user)
         product_id = request.data.get('product_id')
         if not product_id:
             return Response(
                 {"error": "Bad Request", "detail": "Product ID is required."},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        # Check for duplicate items using the improved Product model's primary key field: id.
-        if cart.items.filter(product__id=product_id).exists():
+        try:
+            with transaction.atomic():
+                return super().create(request, *args, **kwargs)
+        except IntegrityError:
             return Response(
                 {"error": "Duplicate Item",
                     "detail": "This product is already in your cart."},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        return super().create(request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        cart, _ = Cart.objects.get_or_create(user=self.request.user)
-        serializer.save(cart=cart)
+        serializer.save(cart=get_request_cart(self.request))
+        invalidate_cart_summary(self.request.user.id)
+
+    def perform_update(self, serializer):
+        serializer.save()
+        invalidate_cart_summary(self.request.user.id)
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        invalidate_cart_summary(self.request.user.id)
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """
+        Lightweight cart overview for badges and checkout warnings: item count,
+        subtotal of purchasable items, and unavailable or self-owned items.
+        """
+        return Response(get_cart_summary(request.user))
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        Add several products at once. Sold, inactive, unknown and self-owned
+        products are skipped; products already in the cart are left as they are
+        and reported under ``already_in_cart``.
+        """
+        requested = parse_uuid_list(request.data, 'product_ids')
+        cart = get_request_cart(request)
+        available = set(
+            Product.objects.filter(id__in=requested, is_sold=False, is_active=True)
+            .exclude(seller=request.user)
+            .values_list('id', flat=True)
+        )
+        existing = set(
+            CartItem.objects.filter(cart=cart, product_id__in=available).values_list('product_id', flat=True)
+        )
+        added = available - existing
+        # ignore_conflicts still guards against a concurrent add of the same product.
+        CartItem.objects.bulk_create(
+            [CartItem(cart=cart, product_id=product_id) for product_id in added],
+            ignore_conflicts=True
+        )
+        if added:
+            invalidate_cart_summary(request.user.id)
+        return Response(
+            {"detail": "Products added to your cart.",
+                "added": [str(product_id) for product_id in added],
+                "already_in_cart": [str(product_id) for product_id in existing],
+                "skipped": [str(product_id) for product_id in requested - available]},
+            status=status.HTTP_201_CREATED
+        )
 
 
 class EmptyCartView(APIView):
@@ -499,8 +772,8 @@ class EmptyCartView(APIView):
     permission_classes = [IsAuthenticated]
 
     def delete(self, request):
-        cart, _ = Cart.objects.get_or_create(user=self.request.user)
-        cart.items.all().delete()
+        CartItem.objects.filter(cart__user=request.user).delete()
+        invalidate_cart_summary(request.user.id)
         return Response(
             {"detail": "Your cart has been emptied successfully."},
             status=status.HTTP_204_NO_CONTENT
@@ -512,15 +785,22 @@ class OrderViewSet(viewsets.ModelViewSet):
     Full CRUD for orders.
     Non-admin users can create (if needed) and retrieve their orders.
     Only administrators are allowed to update or delete orders.
+
+    The list is cursor paginated newest first over the (user, created_at, id)
+    index. Items render their product from the details captured at checkout,
+    so a page is one order query plus one item query.
     """
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = OrderHistoryPagination
 
     def get_queryset(self):
         user = self.request.user
+        # Items render from their checkout snapshot; no product joins needed.
+        queryset = Order.objects.prefetch_related('items')
         if user.role == 'Admin':
-            return Order.objects.all()
-        return Order.objects.filter(user=user)
+            return queryset
+        return queryset.filter(user=user)
 
     def create(self, request, *args, **kwargs):
         # Typically orders are created via checkout.
@@ -575,7 +855,8 @@ class CheckoutView(APIView):
     3. Process payments.
     4. Create transactions.
     5. Update product status.
-    6. Clear cart.
+    6. Record outbox events for downstream consumers.
+    7. Clear cart.
 
     Security:
     - Prevents self-purchase of products.
@@ -584,10 +865,11 @@ class CheckoutView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        cart, _ = Cart.objects.get_or_create(user=request.user)
+        cart = get_request_cart(request)
         cart_items = cart.items.select_related(
-            'product', 'product__seller').all()
+            'product', 'product__seller').prefetch_related('product__images').all()
         if not cart_items.exists():
+            CHECKOUTS.inc(outcome='rejected')
             return Response(
                 {"error": "Empty Cart",
                     "detail": "Your cart is empty. Please add products before checking out."},
@@ -597,6 +879,7 @@ class CheckoutView(APIView):
         # Validate: Check if any products are already sold
         sold_items = [item for item in cart_items if item.product.is_sold]
         if sold_items:
+            CHECKOUTS.inc(outcome='conflict')
             titles = ", ".join([item.product.title for item in sold_items])
             return Response(
                 {"error": "Products Unavailable",
@@ -608,6 +891,7 @@ class CheckoutView(APIView):
         invalid_items = [
             item for item in cart_items if item.product.seller.username == request.user.username]
         if invalid_items:
+            CHECKOUTS.inc(outcome='rejected')
             titles = ", ".join([item.product.title for item in invalid_items])
             return Response(
                 {"error": "Self Purchase Not Allowed",
@@ -618,6 +902,7 @@ class CheckoutView(APIView):
         # Calculate total considering product prices
         total = sum(float(item.product.price) for item in cart_items)
         if request.user.balance < total:
+            CHECKOUTS.inc(outcome='insufficient_funds')
             return Response(
                 {"error": "Insufficient Funds",
                     "detail": f"Your balance (${request.user.balance:.2f}) is insufficient for this purchase (${total:.2f}). Please add funds or remove items from your cart."},
@@ -636,29 +921,24 @@ class CheckoutView(APIView):
                 status='Completed'  # Changed from 'Pending' to 'Completed' since payment is immediate
             )
 
+            # Side effects are recorded in the outbox and delivered after commit
+            events = [outbox.event(
+                'OrderPlaced', order_id=str(order.id), user_id=str(request.user.id), total=f"{total:.2f}"
+            )]
+
             # Process each cart item
             for cart_item in cart_items:
                 product = cart_item.product
                 seller = product.seller
                 item_price = float(product.price)
 
-                # Create order item
-                OrderItem.objects.create(
-                    order=order,
-                    product=product,
-                    price=item_price
-                )
+                # Create order item with a snapshot of the product as sold
+                OrderItem.snapshot(order, product).save()
 
                 # Update seller's balance
                 seller.balance = F('balance') + item_price
                 seller.save()
 
-                # Update product status
-                product.is_sold = True
-                product.is_active = False
-                product.bought_by = request.user
-                product.save()
-
                 # Create transaction record
                 Transaction.objects.create(
                     product=product,
@@ -669,11 +949,32 @@ class CheckoutView(APIView):
                     transaction_status='Successful'
                 )
 
+                events.append(outbox.event(
+                    'ItemSold', order_id=str(order.id), product_id=str(product.id),
+                    seller_id=str(seller.id), buyer_id=str(request.user.id), price=f"{item_price:.2f}"
+                ))
+                events.append(outbox.event(
+                    'BalanceCredited', order_id=str(order.id), user_id=str(seller.id), amount=f"{item_price:.2f}"
+                ))
+
+            outbox.enqueue(events)
+
+            # Mark every product sold in one statement; queryset updates bypass
+            # post_save, so other carts holding them are invalidated once here.
+            product_ids = [cart_item.product_id for cart_item in cart_items]
+            Product.objects.filter(id__in=product_ids).update(
+                is_sold=True, is_active=False, bought_by=request.user, updated_at=timezone.now()
+            )
+            invalidate_cart_summaries_for_products(product_ids)
+
             # Clear the cart
             cart.items.all().delete()
+            invalidate_cart_summary(request.user.id)
             request.user.refresh_from_db()
 
             # Prepare response with order details
+            transaction.on_commit(lambda: CHECKOUTS.inc(outcome='success'))
+            order = Order.objects.prefetch_related('items').get(pk=order.pk)
             order_serializer = OrderSerializer(order)
             return Response({
                 "detail": "Your order has been placed successfully.",
@@ -722,11 +1023,191 @@ class AdminReportViewSet(viewsets.ModelViewSet):
     - Access to all user reports.
     - Can update report status.
     - Manage dispute resolution.
+
+    Endpoints:
+    - GET: Reports newest first, cursor paginated; ``?status=`` narrows the
+      list over the (status, created_at) index.
+    - GET queue/?type=product|user: Pending reports grouped per reported
+      product or user with count, most recent reason and age (paginated).
+    - POST bulk-resolve/: Resolve pending reports by ``ids``, ``product_ids``
+      and/or ``user_ids`` in a single UPDATE.
+    - POST bulk-deactivate/: Deactivate reported products/users and resolve
+      their pending reports.
     """
     serializer_class = ReportSerializer
     permission_classes = [IsAdminUser]
+    pagination_class = ReportPagination
     queryset = Report.objects.all()
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        report_status = self.request.query_params.get('status')
+        if self.action == 'list' and report_status:
+            if report_status not in dict(Report._meta.get_field('status').choices):
+                raise ValidationError({"status": "Unknown report status."})
+            queryset = queryset.filter(status=report_status)
+        return queryset
+
+    QUEUE_TARGETS = {
+        'product': ('reported_product', 'reported_product__title'),
+        'user': ('reported_user', 'reported_user__username'),
+    }
+
+    @action(detail=False, methods=['get'])
+    def queue(self, request):
+        target_type = request.query_params.get('type', 'product')
+        if target_type not in self.QUEUE_TARGETS:
+            raise ValidationError({"type": "Must be 'product' or 'user'."})
+        target, label = self.QUEUE_TARGETS[target_type]
+
+        pending = Report.objects.filter(status='Pending')
+        latest_reason = pending.filter(**{target: OuterRef(target)}).order_by('-created_at').values('reason')[:1]
+        groups = (
+            pending.filter(**{f"{target}__isnull": False})
+            .values(target, label)
+            .annotate(report_count=Count('id'), oldest_report_at=Min('created_at'),
+                      latest_reason=Subquery(latest_reason))
+            .order_by('-report_count', 'oldest_report_at')
+        )
+
+        paginator = ModerationQueuePagination()
+        page = paginator.paginate_queryset(groups, request, view=self)
+        now = timezone.now()
+        return paginator.get_paginated_response([
+            {
+                'target_type': target_type,
+                'target_id': group[target],
+                'target_label': group[label],
+                'report_count': group['report_count'],
+                'latest_reason': group['latest_reason'],
+                'oldest_report_at': group['oldest_report_at'],
+                'age_seconds': int((now - group['oldest_report_at']).total_seconds()),
+            }
+            for group in page
+        ])
+
+    def _pending_reports_for(self, ids=(), product_ids=(), user_ids=()):
+        return Report.objects.filter(status='Pending').filter(
+            Q(id__in=ids) | Q(reported_product__in=product_ids) | Q(reported_user__in=user_ids)
+        )
+
+    def _mark_reviewed(self, reports, new_status):
+        now = timezone.now()
+        return reports.update(status=new_status, reviewed_by=self.request.user, reviewed_at=now, updated_at=now)
+
+    @action(detail=False, methods=['post'], url_path='bulk-resolve')
+    def bulk_resolve(self, request):
+        ids = parse_uuid_list(request.data, 'ids', required=False)
+        product_ids = parse_uuid_list(request.data, 'product_ids', required=False)
+        user_ids = parse_uuid_list(request.data, 'user_ids', required=False)
+        if not (ids or product_ids or user_ids):
+            raise ValidationError("Provide ids, product_ids or user_ids.")
+        new_status = request.data.get('status', 'Resolved')
+        if new_status not in ('Reviewed', 'Resolved'):
+            raise ValidationError({"status": "Must be 'Reviewed' or 'Resolved'."})
+
+        updated = self._mark_reviewed(self._pending_reports_for(ids, product_ids, user_ids), new_status)
+        return Response({"detail": f"{updated} report(s) updated.", "updated": updated}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='bulk-deactivate')
+    def bulk_deactivate(self, request):
+        product_ids = parse_uuid_list(request.data, 'product_ids', required=False)
+        user_ids = parse_uuid_list(request.data, 'user_ids', required=False)
+        if not (product_ids or user_ids):
+            raise ValidationError("Provide product_ids and/or user_ids.")
+
+        now = timezone.now()
+        with transaction.atomic():
+            products = Product.objects.filter(id__in=product_ids).update(is_active=False, updated_at=now)
+            users = User.objects.filter(id__in=user_ids).update(is_active=False, updated_at=now)
+            resolved = self._mark_reviewed(self._pending_reports_for(product_ids=product_ids, user_ids=user_ids), 'Resolved')
+            # Queryset updates bypass post_save, so cached cart summaries are dropped
+            # here: carts holding the products, and those holding the users' listings.
+            invalidate_cart_summaries_for_products(product_ids)
+            invalidate_cart_summaries_for_sellers(user_ids)
+        return Response(
+            {"detail": "Deactivation complete.",
+                "products_deactivated": products, "users_deactivated": users, "reports_resolved": resolved},
+            status=status.HTTP_200_OK
+        )
+
+
+class AdminStatsView(APIView):
+    """
+    Admin dashboard statistics read from the DailyMetric rollup.
+
+    Query parameters:
+    - start, end: Inclusive ISO dates (default: the last 30 days).
+
+    Returns range totals, a per-day series and a per-category breakdown.
+    Figures are as fresh as the last rollup_daily_metrics run.
+    """
+    permission_classes = [IsAdminUser]
+    SUMMED_FIELDS = ('orders', 'items_sold', 'gmv', 'new_listings', 'new_users')
+
+    def get(self, request):
+        today = timezone.localdate()
+        start = parse_query_date(request.query_params, 'start') or today - timedelta(days=29)
+        end = parse_query_date(request.query_params, 'end') or today
+        if start > end:
+            raise ValidationError({"start": "start must not be after end."})
+
+        metrics = DailyMetric.objects.filter(day__gte=start, day__lte=end)
+        daily = metrics.filter(category__isnull=True)
+        summary = daily.aggregate(**{field: Sum(field) for field in self.SUMMED_FIELDS})
+        series = list(daily.order_by('day').values('day', *self.SUMMED_FIELDS))
+        categories = list(
+            metrics.filter(category__isnull=False)
+            .values('category', category_name=F('category__name'))
+            .annotate(items_sold=Sum('items_sold'), gmv=Sum('gmv'), new_listings=Sum('new_listings'))
+            .order_by('-gmv')
+        )
+        totals = {field: summary[field] or 0 for field in self.SUMMED_FIELDS}
+        # Money is rendered as a fixed-point string, matching serializer output.
+        for row in [totals, *series, *categories]:
+            row['gmv'] = f"{row['gmv'] or 0:.2f}"
+        return Response({
+            "start": start,
+            "end": end,
+            "totals": totals,
+            "daily": series,
+            "categories": categories,
+        })
+
+
+class AdminExportView(APIView):
+    """
+    Stream all transactions or orders as CSV or JSON Lines.
+
+    Query parameters:
+    - output: csv (default) or jsonl.
+    - start, end: Optional inclusive ISO dates on created_at.
+
+    Rows are streamed from a database iterator, so memory use does not grow
+    with the size of the export, under WSGI and ASGI alike.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, dataset):
+        if dataset not in EXPORTS:
+            raise NotFound("Unknown export.")
+        export_format = request.query_params.get('output', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({"output": f"Must be one of: {', '.join(sorted(EXPORT_FORMATS))}."})
+        dates = {name: parse_query_date(request.query_params, name) for name in ('start', 'end')}
+        if dates['start'] and dates['end'] and dates['start'] > dates['end']:
+            raise ValidationError({"start": "start must not be after end."})
+
+        # Django buffers sync iterators under ASGI; stream an async one there instead.
+        lines = aexport_lines if isinstance(request._request, ASGIRequest) else export_lines
+        response = StreamingHttpResponse(
+            lines(dataset, export_format, **dates),
+            content_type=EXPORT_FORMATS[export_format]
+        )
+        filename = export_filename(dataset, export_format, **dates)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
 
 class CheckIsAuthenticated(APIView):
     """